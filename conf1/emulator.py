@@ -1,9 +1,20 @@
 import argparse
 import os
+import sys
 import tarfile
 import tkinter as tk
+from collections import deque
 from tkinter import scrolledtext
 
+from shell import DEFAULT_CACHE_SIZE, FileSink, ShellCore
+
+# Сколько строк вывода хранит виджет; старые строки удаляются сверху
+DEFAULT_SCROLLBACK = 10000
+# Большой вывод вставляется частями по столько строк через after()
+RENDER_CHUNK_LINES = 2000
+# Период вывода прогресса потоковой загрузки в окно, мс
+LOADING_POLL_MS = 100
+
 
 def create_test_tar(tar_path):
     """Создание тестового tar-архива для демонстрации с несколькими папками."""
@@ -44,166 +55,166 @@ def create_test_tar(tar_path):
     print(f"Test tar archive created at {tar_path}")
 
 
-class ShellEmulator:
-    def __init__(self, username, startup_script, tar_path, output_widget=None):
-        self.root = tk.Tk()
-        self.username = username
-        self.startup_script = startup_script
-        self.tar_path = tar_path
-        self.file_system = {}
-        self.current_path = '/'
-        self.output_widget = output_widget
-        self.load_virtual_fs()
-        self.run_startup_script()
-
-    def load_virtual_fs(self):
-        """Загрузка виртуальной файловой системы из tar-архива."""
-        try:
-            with tarfile.open(self.tar_path, "r") as tar:
-                for member in tar.getmembers():
-                    if member.isfile():
-                        # Считываем содержимое файла и сохраняем в словарь
-                        self.file_system[member.name] = tar.extractfile(member).read().decode('utf-8')
-            self.output_widget.insert(tk.END, f"Virtual filesystem loaded from {self.tar_path}\n")
-        except Exception as e:
-            self.output_widget.insert(tk.END, f"Error loading virtual filesystem: {str(e)}\n")
-
-    def run_startup_script(self):
-        """Запуск стартового скрипта."""
-        if os.path.isfile(self.startup_script):
-            with open(self.startup_script, 'r') as f:
-                for command in f:
-                    self.execute_command(command.strip())
+class WidgetSink:
+    """Вывод в текстовый виджет Tk с буферизацией.
 
-    def execute_command(self, command):
-        """Исполнение команды."""
-        if not command.strip():  # Игнорирование пустых команд
-            return
-        if command.startswith('ls'):
-            self.list_files()
-        elif command.startswith('cd'):
-            args = command.split()
-            if len(args) > 1:
-                self.change_directory(args[1])
-            else:
-                self.output_widget.insert(tk.END, "Usage: cd <directory>\n")
-        elif command.startswith('exit'):
-            self.exit_emulator()
-        elif command.startswith('find'):
-            args = command.split()
-            if len(args) > 1:
-                self.find_file(args[1])
-            else:
-                self.output_widget.insert(tk.END, "Usage: find <filename>\n")
-        elif command.startswith('chown'):
-            args = command.split()
-            if len(args) > 2:
-                self.change_owner(args[1], args[2])
-            else:
-                self.output_widget.insert(tk.END, "Usage: chown <file> <new_owner>\n")
-        else:
-            self.output_widget.insert(tk.END, f"Unknown command: {command}\n")
-
-    def list_files(self):
-        """Вывод списка файлов и директорий в текущей директории."""
-        dir_path = self.current_path.lstrip('/') + '/' if self.current_path != '/' else ''
-
-        # Разделяем файлы и каталоги
-        files = []
-        directories = set()
-
-        for name in self.file_system.keys():
-            if name.startswith(dir_path):
-                remaining_path = name[len(dir_path):]
-                if '/' in remaining_path:
-                    directories.add(remaining_path.split('/')[0])
-                else:
-                    files.append(remaining_path)
-
-        self.output_widget.insert(tk.END, f"Files in {self.current_path}:\n")
-        if directories:
-            self.output_widget.insert(tk.END, "Directories:\n")
-            self.output_widget.insert(tk.END, "\n".join(sorted(directories)) + "\n")
-        if files:
-            self.output_widget.insert(tk.END, "Files:\n")
-            self.output_widget.insert(tk.END, "\n".join(sorted(files)) + "\n")
-        if not files and not directories:
-            self.output_widget.insert(tk.END, "No files or directories found.\n")
-
-    def change_directory(self, path):
-        """Изменение текущей директории."""
-        if path == '/':
-            self.current_path = '/'
-            return
+    Вывод команды копится в буфере и вставляется в flush() одним insert.
+    Если строк больше RENDER_CHUNK_LINES, остаток вставляется частями через
+    after(), чтобы не блокировать цикл событий. В виджете остаётся не больше
+    scrollback строк.
+    """
+
+    def __init__(self, widget, scrollback=DEFAULT_SCROLLBACK, chunk_lines=RENDER_CHUNK_LINES):
+        self.widget = widget
+        self.scrollback = scrollback
+        self.chunk_lines = chunk_lines
+        self.parts = []
+        self.pending = deque()
+        self.scheduled = False
+        self.lines = 0
 
-        new_path = os.path.normpath(os.path.join(self.current_path, path)).lstrip('/')
-        if new_path == '':
-            new_path = '/'
+    def write(self, text):
+        self.parts.append(text)
 
-        # Проверка на существование директории в virtual_fs
-        if any(key.startswith(new_path + '/') or new_path == key for key in self.file_system.keys()):
-            self.current_path = '/' + new_path
+    def flush(self):
+        if not self.parts:
+            return
+        lines = ''.join(self.parts).splitlines(keepends=True)
+        self.parts = []
+        for start in range(0, len(lines), self.chunk_lines):
+            self.pending.append(''.join(lines[start:start + self.chunk_lines]))
+        if not self.scheduled:
+            self.render()
+
+    def render(self):
+        """Вставляет одну часть и планирует следующую."""
+        self.scheduled = False
+        if not self.pending:
+            return
+        text = self.pending.popleft()
+        self.widget.insert(tk.END, text)
+        self.lines += text.count('\n')
+        if self.lines > self.scrollback:
+            # Строки Text нумеруются с 1: удаляем лишние строки сверху
+            self.widget.delete('1.0', f'{self.lines - self.scrollback + 1}.0')
+            self.lines = self.scrollback
+        if self.pending:
+            self.scheduled = True
+            self.widget.after(1, self.render)
+
+
+class ShellEmulator(ShellCore):
+    """GUI-обёртка над ShellCore: вывод в виджет, exit закрывает окно."""
+
+    def __init__(self, username, startup_script, tar_path, output_widget=None,
+                 lazy=False, cache_size=DEFAULT_CACHE_SIZE, index_cache=False, root=None,
+                 scrollback=DEFAULT_SCROLLBACK, journal=None, stream=False):
+        self.root = root
+        self.output_widget = output_widget
+        sink = WidgetSink(output_widget, scrollback) if output_widget is not None else None
+        super().__init__(username, startup_script, tar_path, sink,
+                         lazy=lazy, cache_size=cache_size, index_cache=index_cache, journal=journal,
+                         stream=stream)
+        self.flush_output()
+        if self.root and self.stream:
+            # Загрузка могла уже закончиться, но стартовый скрипт всё равно запускает poll_loading
+            self.root.after(LOADING_POLL_MS, self.poll_loading)
+
+    def flush_output(self):
+        # Фоновый загрузчик пишет в sink под той же блокировкой
+        with self.lock:
+            self.sink.flush()
+
+    def poll_loading(self):
+        """Показывает прогресс потоковой загрузки, пока она не закончится,
+        затем запускает стартовый скрипт."""
+        self.flush_output()
+        if not self.loaded.is_set():
+            self.root.after(LOADING_POLL_MS, self.poll_loading)
         else:
-            self.output_widget.insert(tk.END, f"No such directory: {path}\n")
+            self.run_startup_script()
 
-    def get_directories(self):
-        """Возвращает список директорий в виртуальной файловой системе."""
-        return set(os.path.dirname(path) for path in self.file_system.keys())
+    def on_stream_loaded(self):
+        # Команды пишут в виджет, поэтому с окном скрипт запускает poll_loading в потоке Tk
+        if self.root is None:
+            super().on_stream_loaded()
+
+    def execute_command(self, command):
+        """Исполнение команды; её вывод попадает в виджет одной вставкой."""
+        super().execute_command(command)
+        self.flush_output()
 
     def exit_emulator(self):
         """Выход из эмулятора."""
+        super().exit_emulator()
         if self.root:
             self.root.quit()
             self.root.destroy()
 
-    def find_file(self, filename):
-        """Поиск файла или директории в виртуальной файловой системе."""
-        found_items = []
-        for name in self.file_system.keys():
-            # Проверяем, содержит ли путь искомое имя (файлы и папки)
-            if filename in os.path.basename(name) or filename in os.path.dirname(name):
-                found_items.append(name)
-
-        if found_items:
-            self.output_widget.insert(tk.END, "Found items:\n")
-            self.output_widget.insert(tk.END, "\n".join(found_items) + "\n")
-        else:
-            self.output_widget.insert(tk.END, f"No items found matching: {filename}\n")
 
-    def change_owner(self, file_path, new_owner):
-        """Изменение владельца файла или директории."""
-        try:
-            if file_path not in self.file_system:
-                self.output_widget.insert(tk.END, f"No such file or directory: {file_path}\n")
-                return
+def run_batch(args):
+    """Пакетный режим без GUI: команды из --startup_script или stdin, вывод в stdout.
 
-            # Эмуляция изменения владельца
-            self.file_system[file_path] = {'owner': new_owner}
-            self.output_widget.insert(tk.END, f"Changed owner of {file_path} to {new_owner}\n")
-        except Exception as e:
-            self.output_widget.insert(tk.END, f"Error changing owner: {str(e)}\n")
+    Команды исполняются после полной загрузки архива, чтобы вывод не зависел
+    от скорости потокового чтения.
+    """
+    sink = FileSink(sys.stdout)
+    core = ShellCore(args.username, None, args.tar_path, sink,
+                     lazy=args.lazy, cache_size=args.cache_size, index_cache=args.index_cache,
+                     journal=args.journal, stream=args.stream)
+    core.wait_loaded()
+    if args.startup_script:
+        core.startup_script = args.startup_script
+        core.run_startup_script()
+    else:
+        core.run_commands(sys.stdin)
+    sink.flush()
 
 
 def main():
     global root
     parser = argparse.ArgumentParser(description='Shell Emulator')
     parser.add_argument('--username', required=True, help='Username for the shell prompt')
-    parser.add_argument('--startup_script', required=True, help='Path to the startup script')
+    parser.add_argument('--startup_script', help='Path to the startup script (in batch mode stdin is used if omitted)')
     parser.add_argument('--tar_path', required=True, help='Path to the tar archive of the virtual filesystem')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Index tar headers only and read file contents on first access')
+    parser.add_argument('--cache_size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='Max characters of file contents cached in lazy mode')
+    parser.add_argument('--index_cache', action='store_true',
+                        help='Keep the archive member table in <tar_path>.index and reuse it while the archive is unchanged')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the archive (also gzip/bz2/xz) as a stream in the background; '
+                             'commands work on the part already read')
+    parser.add_argument('--journal',
+                        help='Append metadata changes (chown) to this file and replay them on start')
+    parser.add_argument('--scrollback', type=int, default=DEFAULT_SCROLLBACK,
+                        help='Max lines kept in the output window')
+    parser.add_argument('--batch', action='store_true',
+                        help='Run the startup script or stdin without GUI and print the output')
 
     args = parser.parse_args()
+    if not args.batch and not args.startup_script:
+        parser.error('--startup_script is required without --batch')
 
     # Если архив не существует, создаём его
     if not os.path.exists(args.tar_path):
         create_test_tar(args.tar_path)
 
+    if args.batch:
+        run_batch(args)
+        return
+
     root = tk.Tk()
     root.title("Shell Emulator")
 
     output_widget = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=50, height=20)
     output_widget.pack()
 
-    emulator = ShellEmulator(args.username, args.startup_script, args.tar_path, output_widget)
+    emulator = ShellEmulator(args.username, args.startup_script, args.tar_path, output_widget,
+                             lazy=args.lazy, cache_size=args.cache_size, index_cache=args.index_cache,
+                             root=root, scrollback=args.scrollback, journal=args.journal,
+                             stream=args.stream)
 
     def on_command_entered(event):
         command = command_entry.get()
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+from typing import Optional
+
+from shell import DEFAULT_CACHE_SIZE, BufferSink, CallbackSink, ShellCore
+
+
+async def handle_session(core: ShellCore, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Один клиент - один сеанс: команда на строку, ответ с длиной в заголовке.
+
+    Ответ: строка с числом байт вывода, затем сам вывод в UTF-8.
+    """
+    sink = BufferSink()
+    session = core.session(sink)
+    try:
+        while session.running:
+            line = await reader.readline()
+            if not line:
+                break
+            session.execute_command(line.decode('utf-8', errors='replace').strip())
+            data = sink.getvalue().encode('utf-8')
+            sink.parts = []
+            writer.write(f"{len(data)}\n".encode('ascii') + data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(core: ShellCore, host: str = '127.0.0.1', port: int = 0, unix_path: Optional[str] = None):
+    """Запускает сервер; сеансы разделяют архив, загруженный в core."""
+    def handler(reader, writer):
+        return handle_session(core, reader, writer)
+
+    if unix_path:
+        return await asyncio.start_unix_server(handler, path=unix_path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, command: str) -> str:
+    """Клиентская сторона протокола: отправить команду и прочитать ответ."""
+    writer.write(command.encode('utf-8') + b'\n')
+    await writer.drain()
+    header = await reader.readline()
+    if not header:
+        raise ConnectionError("Server closed the connection")
+    return (await reader.readexactly(int(header))).decode('utf-8')
+
+
+async def run_server(args):
+    # Сообщения загрузчика, в том числе прогресс фоновой загрузки, сразу в stdout
+    sink = CallbackSink(lambda text: print(text, end='', flush=True))
+    core = ShellCore('server', None, args.tar_path, sink, lazy=args.lazy,
+                     cache_size=args.cache_size, index_cache=args.index_cache, stream=args.stream)
+    server = await serve(core, args.host, args.port, args.socket)
+    for sock in server.sockets:
+        print(f"Serving on {sock.getsockname()}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve shell emulator sessions over a local socket')
+    parser.add_argument('--tar_path', required=True, help='Path to the tar archive of the virtual filesystem')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Index tar headers only and read file contents on first access')
+    parser.add_argument('--cache_size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='Max characters of file contents cached in lazy mode')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the archive as a stream in the background and serve the part already read')
+    parser.add_argument('--index_cache', action='store_true',
+                        help='Keep the archive member table in <tar_path>.index and reuse it while the archive is unchanged')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+import copy
+import math
+import os
+import re
+import tarfile
+import threading
+from typing import Callable, Iterable, List, TextIO
+
+from vfs import ArchiveIndex, DirectoryTree, Entry, LazyFileSystem, MetadataTable, Overlay
+
+# Ограничение кэша содержимого в ленивом режиме, в символах
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
+
+# Единицы -size как в GNU find; без суффикса - блоки по 512 байт
+SIZE_UNITS = {'c': 1, 'w': 2, 'b': 512, 'k': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+FIND_PREDICATES = ('-name', '-regex', '-type', '-size')
+# Потоковая загрузка: членов за одну блокировку и шаг отчёта о прогрессе, %
+STREAM_BATCH = 256
+PROGRESS_STEP = 10
+
+
+def size_predicate(spec: str):
+    """Функция от размера в байтах для выражения -size вида [+-]N[cwbkMG].
+
+    Размер округляется вверх до единиц, +N - больше N, -N - меньше N.
+    """
+    match = re.fullmatch(r'([+-]?)(\d+)([cwbkMG]?)', spec)
+    if match is None:
+        raise ValueError(f"invalid -size argument: {spec}")
+    sign, number, unit = match.groups()
+    number = int(number)
+    unit = SIZE_UNITS[unit or 'b']
+    if sign == '+':
+        return lambda size: math.ceil(size / unit) > number
+    if sign == '-':
+        return lambda size: math.ceil(size / unit) < number
+    return lambda size: math.ceil(size / unit) == number
+
+
+class BufferSink:
+    """Накапливает вывод в памяти, текст целиком - getvalue()."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+
+    def write(self, text: str):
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> str:
+        return ''.join(self.parts)
+
+
+class FileSink:
+    """Пишет вывод в файл крупными блоками, а не построчно."""
+
+    def __init__(self, file: TextIO, buffer_size: int = 64 * 1024):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.parts: List[str] = []
+        self.size = 0
+
+    def write(self, text: str):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.file.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+        self.file.flush()
+
+
+class CallbackSink:
+    """Передаёт каждый фрагмент вывода в callback."""
+
+    def __init__(self, callback: Callable[[str], None]):
+        self.callback = callback
+
+    def write(self, text: str):
+        self.callback(text)
+
+    def flush(self):
+        pass
+
+
+class ShellCore:
+    """Ядро эмулятора без GUI: команды над виртуальной ФС и вывод в sink.
+
+    sink - любой объект с методами write(text) и flush().
+    """
+
+    def __init__(self, username, startup_script, tar_path, sink=None,
+                 lazy=False, cache_size=DEFAULT_CACHE_SIZE, index_cache=False, journal=None,
+                 stream=False):
+        self.username = username
+        self.startup_script = startup_script
+        self.tar_path = tar_path
+        self.sink = sink if sink is not None else BufferSink()
+        self.lazy = lazy
+        self.cache_size = cache_size
+        self.index_cache = index_cache
+        self.journal = journal
+        self.stream = stream
+        # Загрузчик в фоне меняет дерево и словари под этой блокировкой
+        self.lock = threading.RLock()
+        self.loaded = threading.Event()
+        self.file_system = {}
+        self.sizes = {}
+        self.tree = DirectoryTree()
+        self.metadata = MetadataTable({})
+        self.current_path = '/'
+        self.running = True
+        self.load_virtual_fs()
+        if not self.stream:
+            # В потоковом режиме скрипт запускает загрузчик, когда индекс заполнен
+            self.run_startup_script()
+
+    def write(self, text):
+        self.sink.write(text)
+
+    def session(self, sink=None) -> 'ShellCore':
+        """Новый сеанс над уже загруженным архивом.
+
+        Содержимое, дерево и заголовки общие и не копируются; у сеанса свои
+        текущий каталог, overlay метаданных и sink.
+        """
+        session = copy.copy(self)
+        session.sink = sink if sink is not None else BufferSink()
+        session.current_path = '/'
+        session.running = True
+        session.metadata = MetadataTable(self.metadata.entries, Overlay())
+        return session
+
+    def wait_loaded(self, timeout=None) -> bool:
+        """Ждёт окончания загрузки архива (в потоковом режиме она идёт в фоне
+        вместе со стартовым скриптом)."""
+        return self.loaded.wait(timeout)
+
+    def load_virtual_fs(self):
+        """Загрузка виртуальной файловой системы из tar-архива."""
+        if self.stream:
+            # Архив читается потоком в фоне, команды работают с уже прочитанной частью
+            self.metadata = MetadataTable({}, Overlay(self.journal))
+            threading.Thread(target=self.stream_archive, daemon=True).start()
+            return
+        try:
+            if self.lazy:
+                # Ленивый режим: читаем только заголовки, содержимое - при обращении
+                index = ArchiveIndex(self.tar_path, use_cache=self.index_cache)
+                self.file_system = LazyFileSystem(index, self.cache_size)
+                entries = index.entries
+            elif self.index_cache:
+                # Таблица членов из кэша индекса: архив не обходится заново
+                index = ArchiveIndex(self.tar_path, use_cache=True)
+                entries = index.entries
+                try:
+                    for name, entry in entries.items():
+                        if entry.isfile():
+                            self.file_system[name] = index.read(name).decode('utf-8')
+                finally:
+                    index.close()
+            else:
+                entries = {}
+                with tarfile.open(self.tar_path, "r") as tar:
+                    for member in tar.getmembers():
+                        entries[member.name] = Entry.from_member(member)
+                        if member.isfile():
+                            # Считываем содержимое файла и сохраняем в словарь
+                            self.file_system[member.name] = tar.extractfile(member).read().decode('utf-8')
+            # Метаданные из заголовков; правки ложатся в overlay, архив не меняется
+            self.metadata = MetadataTable(entries, Overlay(self.journal))
+            self.sizes = {name: entry.size for name, entry in entries.items()}
+            # Дерево каталогов с размерами для ls/cd/find вместо перебора всех путей
+            self.tree = DirectoryTree(self.file_system.keys(), self.sizes)
+            self.write(f"Virtual filesystem loaded from {self.tar_path}\n")
+        except Exception as e:
+            self.write(f"Error loading virtual filesystem: {str(e)}\n")
+        finally:
+            self.loaded.set()
+
+    def stream_archive(self):
+        """Читает архив в режиме 'r|*' (в том числе gzip/bz2/xz) и пополняет
+        индекс пачками; прогресс по прочитанным байтам пишется в sink.
+
+        Стартовый скрипт запускается через on_stream_loaded, когда архив
+        прочитан целиком.
+        """
+        try:
+            try:
+                self.read_stream()
+                with self.lock:
+                    self.write(f"Virtual filesystem loaded from {self.tar_path}\n")
+            except Exception as e:
+                with self.lock:
+                    self.write(f"Error loading virtual filesystem: {str(e)}\n")
+            self.on_stream_loaded()
+        finally:
+            self.loaded.set()
+
+    def on_stream_loaded(self):
+        """Вызывается загрузчиком после чтения архива."""
+        self.run_startup_script()
+
+    def read_stream(self):
+        total = os.path.getsize(self.tar_path)
+        reported = 0
+        batch = []
+        with open(self.tar_path, 'rb') as f, tarfile.open(fileobj=f, mode='r|*') as tar:
+            for member in tar:
+                content = None
+                if member.isfile():
+                    content = tar.extractfile(member).read().decode('utf-8')
+                batch.append((member, content))
+                # Потоковому tarfile список членов не нужен
+                tar.members = []
+                if len(batch) < STREAM_BATCH:
+                    continue
+                self.ingest(batch)
+                batch = []
+                percent = f.tell() * 100 // total
+                if percent >= reported + PROGRESS_STEP:
+                    reported = percent - percent % PROGRESS_STEP
+                    with self.lock:
+                        self.write(f"Loading {self.tar_path}: {percent}% "
+                                   f"({len(self.metadata.entries)} members)\n")
+            self.ingest(batch)
+
+    def ingest(self, batch):
+        """Добавляет прочитанных членов архива в индекс."""
+        with self.lock:
+            for member, content in batch:
+                self.metadata.entries[member.name] = Entry.from_member(member)
+                self.sizes[member.name] = member.size
+                if content is not None:
+                    self.file_system[member.name] = content
+                    self.tree.add(member.name, member.size)
+
+    def run_startup_script(self):
+        """Запуск стартового скрипта."""
+        if self.startup_script and os.path.isfile(self.startup_script):
+            with open(self.startup_script, 'r') as f:
+                self.run_commands(f)
+
+    def run_commands(self, lines: Iterable[str]):
+        """Исполняет команды построчно до конца ввода или до exit."""
+        for command in lines:
+            if not self.running:
+                break
+            self.execute_command(command.strip())
+
+    def execute_command(self, command):
+        """Исполнение команды."""
+        with self.lock:
+            self.dispatch(command)
+
+    def dispatch(self, command):
+        if not command.strip():  # Игнорирование пустых команд
+            return
+        if command.startswith('ls'):
+            self.list_files()
+        elif command.startswith('cd'):
+            args = command.split()
+            if len(args) > 1:
+                self.change_directory(args[1])
+            else:
+                self.write("Usage: cd <directory>\n")
+        elif command.startswith('exit'):
+            self.exit_emulator()
+        elif command.startswith('find'):
+            args = command.split()
+            if any(arg in FIND_PREDICATES for arg in args[1:]):
+                self.find_entries(args[1:])
+            elif len(args) > 1:
+                self.find_file(args[1])
+            else:
+                self.write("Usage: find <filename> | find [path] [-name glob] [-regex re] "
+                           "[-type f|d] [-size [+-]N[cwbkMG]]\n")
+        elif command.startswith('chown'):
+            args = command.split()
+            if len(args) > 2:
+                self.change_owner(args[1], args[2])
+            else:
+                self.write("Usage: chown <file> <new_owner>\n")
+        else:
+            self.write(f"Unknown command: {command}\n")
+
+    def list_files(self):
+        """Вывод списка файлов и директорий в текущей директории."""
+        directories, files = self.tree.listing(self.current_path)
+
+        self.write(f"Files in {self.current_path}:\n")
+        if directories:
+            self.write("Directories:\n")
+            self.write("\n".join(directories) + "\n")
+        if files:
+            self.write("Files:\n")
+            self.write("\n".join(files) + "\n")
+        if not files and not directories:
+            self.write("No files or directories found.\n")
+
+    def change_directory(self, path):
+        """Изменение текущей директории."""
+        if path == '/':
+            self.current_path = '/'
+            return
+
+        new_path = os.path.normpath(os.path.join(self.current_path, path)).lstrip('/')
+        if new_path == '':
+            new_path = '/'
+
+        # Проверка на существование пути в дереве virtual_fs
+        if self.tree.lookup(new_path) is not None:
+            self.current_path = '/' + new_path.lstrip('/')
+        else:
+            self.write(f"No such directory: {path}\n")
+
+    def get_directories(self):
+        """Возвращает список директорий в виртуальной файловой системе."""
+        return set(self.tree.directories)
+
+    def exit_emulator(self):
+        """Выход из эмулятора: оставшиеся команды не исполняются."""
+        self.running = False
+        self.metadata.overlay.close()
+        self.sink.flush()
+
+    def find_file(self, filename):
+        """Поиск файла или директории в виртуальной файловой системе."""
+        # Совпадение с именем файла или с путём его каталога, через индекс дерева
+        found_items = self.tree.find(filename)
+
+        if found_items:
+            self.write("Found items:\n")
+            self.write("\n".join(found_items) + "\n")
+        else:
+            self.write(f"No items found matching: {filename}\n")
+
+    def find_entries(self, args):
+        """find с условиями -name, -regex, -type и -size по индексу дерева.
+
+        Первый аргумент без '-' - каталог поиска, по умолчанию текущий.
+        """
+        scope = self.current_path
+        if args and not args[0].startswith('-'):
+            scope = os.path.normpath(os.path.join(self.current_path, args[0]))
+            args = args[1:]
+
+        conditions = {}
+        try:
+            if len(args) % 2:
+                raise ValueError(f"missing argument to {args[-1]}")
+            for option, value in zip(args[::2], args[1::2]):
+                if option not in FIND_PREDICATES:
+                    raise ValueError(f"unknown predicate: {option}")
+                if option == '-type' and value not in ('f', 'd'):
+                    raise ValueError(f"unknown argument to -type: {value}")
+                if option == '-regex':
+                    re.compile(value)
+                conditions[option[1:]] = size_predicate(value) if option == '-size' else value
+        except (ValueError, re.error) as e:
+            self.write(f"find: {e}\n")
+            return
+
+        found_items = self.tree.query(scope, **conditions)
+        if found_items is None:
+            self.write(f"No such directory: {scope}\n")
+        elif found_items:
+            self.write("Found items:\n")
+            self.write("\n".join(found_items) + "\n")
+        else:
+            self.write(f"No items found matching: {' '.join(args)}\n")
+
+    def change_owner(self, file_path, new_owner):
+        """Изменение владельца файла или директории.
+
+        Меняется только запись в overlay метаданных, содержимое файла остаётся.
+        """
+        try:
+            path = os.path.normpath(os.path.join(self.current_path, file_path)).strip('/')
+            if not path or (path not in self.metadata.entries and self.tree.lookup(path) is None):
+                self.write(f"No such file or directory: {file_path}\n")
+                return
+
+            self.metadata.update(path, uname=new_owner)
+            self.write(f"Changed owner of {file_path} to {new_owner}\n")
+        except Exception as e:
+            self.write(f"Error changing owner: {str(e)}\n")
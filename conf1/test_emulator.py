@@ -7,6 +7,13 @@ from io import StringIO
 from emulator import ShellEmulator, create_test_tar
 
 
+class LoadedFirstEmulator(ShellEmulator):
+    """Потоковая загрузка, которая заканчивается до конца __init__"""
+    def load_virtual_fs(self):
+        super().load_virtual_fs()
+        self.wait_loaded()
+
+
 class TestShellEmulator(unittest.TestCase):
 
     def setUp(self):
@@ -30,11 +37,26 @@ class TestShellEmulator(unittest.TestCase):
         """Удаляем временные файлы после каждого теста."""
         os.remove(self.tar_file.name)
 
+    def test_stream_startup_script_after_loading(self):
+        """Стартовый скрипт в GUI запускается, даже если архив загрузился раньше окна"""
+        with tempfile.NamedTemporaryFile('w', suffix='.sh', delete=False) as script:
+            script.write("cd subdir\nls\n")
+        self.addCleanup(os.remove, script.name)
+        root = MagicMock()
+        # Как цикл событий Tk, но сразу: after() вызывает callback
+        root.after.side_effect = lambda ms, callback: callback()
+        widget = MagicMock()
+        emulator = LoadedFirstEmulator("test_user", script.name, self.tar_file.name, widget,
+                                       root=root, stream=True)
+        self.assertTrue(emulator.loaded.is_set())
+        widget.insert.assert_called_with('end', 'Files in /subdir:\nFiles:\nfile2.txt\nfile3.txt\n')
+
     def test_list_files(self):
         """Тестируем команду 'ls'"""
+        self.emulator.execute_command("cd subdir")
         self.emulator.execute_command("ls")
         self.output_widget.insert.assert_called_with(
-            'end', 'file2.txt\nfile3.txt\n'
+            'end', 'Files in /subdir:\nFiles:\nfile2.txt\nfile3.txt\n'
         )
 
     def test_change_directory(self):
@@ -54,6 +76,9 @@ class TestShellEmulator(unittest.TestCase):
         self.output_widget.insert.assert_called_with(
             'end', 'Changed owner of file1.txt to new_owner\n'
         )
+        # Содержимое не затирается, меняется только владелец в метаданных
+        self.assertEqual(self.emulator.file_system['file1.txt'], 'This is file1.txt\n')
+        self.assertEqual(self.emulator.metadata.stat('file1.txt')['uname'], 'new_owner')
 
     def test_change_owner_invalid(self):
         """Тестируем команду 'chown' с несуществующим файлом"""
@@ -66,7 +91,7 @@ class TestShellEmulator(unittest.TestCase):
         """Тестируем команду 'find'"""
         self.emulator.execute_command("find file2.txt")
         self.output_widget.insert.assert_called_with(
-            'end', 'subdir/file2.txt\n'
+            'end', 'Found items:\nsubdir/file2.txt\n'
         )
 
     def test_invalid_command(self):
@@ -87,8 +112,47 @@ class TestShellEmulator(unittest.TestCase):
         self.emulator.current_path = '/non_existent_dir'
         self.emulator.execute_command("ls")
         self.output_widget.insert.assert_called_with(
-            'end', 'No files or directories found.\n'
+            'end', 'Files in /non_existent_dir:\nNo files or directories found.\n'
+        )
+
+    def test_lazy_mode(self):
+        """Тестируем ленивую загрузку архива"""
+        emulator = ShellEmulator(
+            username="test_user",
+            startup_script="startup.sh",
+            tar_path=self.tar_file.name,
+            output_widget=self.output_widget,
+            lazy=True
+        )
+        emulator.execute_command("find file2.txt")
+        self.output_widget.insert.assert_called_with(
+            'end', 'Found items:\nsubdir/file2.txt\n'
+        )
+        self.assertEqual(emulator.file_system['subdir/file2.txt'], 'This is file2.txt in subdir\n')
+
+    def test_output_chunks_and_scrollback(self):
+        """Тестируем вставку большого вывода частями и ограничение прокрутки"""
+        emulator = ShellEmulator(
+            username="test_user",
+            startup_script="startup.sh",
+            tar_path=self.tar_file.name,
+            output_widget=self.output_widget,
+            scrollback=3
         )
+        emulator.sink.chunk_lines = 2
+        self.output_widget.reset_mock()
+        emulator.execute_command("find file")
+
+        # Одна вставка сразу, остальные части запланированы через after()
+        self.output_widget.insert.assert_called_once()
+        self.assertEqual(self.output_widget.insert.call_args[0][1].count('\n'), 2)
+        while self.output_widget.after.call_args:
+            callback = self.output_widget.after.call_args[0][1]
+            self.output_widget.after.reset_mock()
+            callback()
+        self.assertEqual(self.output_widget.insert.call_count, 3)
+        self.output_widget.delete.assert_called_with('1.0', '3.0')
+        self.assertEqual(emulator.sink.lines, 3)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from emulator import create_test_tar
+from server import request, serve
+from shell import ShellCore
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tar_file = tempfile.NamedTemporaryFile(delete=False)
+        create_test_tar(self.tar_file.name)
+        self.core = ShellCore("server", None, self.tar_file.name)
+
+    def tearDown(self):
+        os.remove(self.tar_file.name)
+
+    def test_independent_sessions(self):
+        async def scenario():
+            server = await serve(self.core)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                first = await asyncio.open_connection('127.0.0.1', port)
+                second = await asyncio.open_connection('127.0.0.1', port)
+                await request(*first, "cd subdir")
+                await request(*second, "chown file1.txt alice")
+                results = await asyncio.gather(request(*first, "ls"), request(*second, "ls"))
+                self.assertEqual(await request(*first, "exit"), "")
+                second[1].close()
+                return results
+
+        first_ls, second_ls = asyncio.run(scenario())
+        self.assertEqual(first_ls.splitlines()[0], "Files in /subdir:")
+        self.assertEqual(second_ls.splitlines()[0], "Files in /:")
+        # Сеансы не меняют общий загруженный архив
+        self.assertEqual(self.core.current_path, '/')
+        self.assertEqual(self.core.metadata.stat('file1.txt')['uname'],
+                         self.core.metadata.entries['file1.txt'].uname)
+        self.assertEqual(self.core.file_system['file1.txt'], 'This is file1.txt\n')
+
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'shell.sock')
+
+        async def scenario():
+            server = await serve(self.core, unix_path=path)
+            async with server:
+                connection = await asyncio.open_unix_connection(path)
+                output = await request(*connection, "find file2.txt")
+                connection[1].close()
+                return output
+
+        try:
+            self.assertEqual(asyncio.run(scenario()), "Found items:\nsubdir/file2.txt\n")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+            os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import unittest
+from emulator import create_test_tar
+from shell import STREAM_BATCH, CallbackSink, FileSink, ShellCore, size_predicate
+
+
+class GatedCore(ShellCore):
+    """Потоковая загрузка, которая останавливается после первой пачки"""
+    def ingest(self, batch):
+        super().ingest(batch)
+        self.ingested.set()
+        self.gate.wait()
+
+
+class TestShellCore(unittest.TestCase):
+
+    def setUp(self):
+        self.tar_file = tempfile.NamedTemporaryFile(delete=False)
+        create_test_tar(self.tar_file.name)
+
+    def tearDown(self):
+        os.remove(self.tar_file.name)
+
+    def test_buffer_sink(self):
+        core = ShellCore("test_user", None, self.tar_file.name)
+        core.run_commands(["cd subdir\n", "ls\n"])
+        self.assertTrue(core.sink.getvalue().endswith(
+            "Files in /subdir:\nFiles:\nfile2.txt\nfile3.txt\n"))
+
+    def test_callback_sink(self):
+        lines = []
+        core = ShellCore("test_user", None, self.tar_file.name, CallbackSink(lines.append))
+        core.execute_command("find file2.txt")
+        self.assertEqual(lines[-2:], ["Found items:\n", "subdir/file2.txt\n"])
+
+    def test_exit_stops_commands(self):
+        core = ShellCore("test_user", None, self.tar_file.name)
+        core.run_commands(["exit", "cd subdir"])
+        self.assertFalse(core.running)
+        self.assertEqual(core.current_path, '/')
+
+    def find(self, core, command):
+        """Вывод команды; найденные пути отсортированы, порядок os.walk не фиксирован."""
+        core.sink.parts = []
+        core.execute_command(command)
+        lines = core.sink.getvalue().splitlines(keepends=True)
+        return ''.join(lines[:1] + sorted(lines[1:]))
+
+    def test_find_predicates(self):
+        core = ShellCore("test_user", None, self.tar_file.name)
+        self.assertEqual(self.find(core, "find -name file[23].txt"),
+                         "Found items:\nsubdir/file2.txt\nsubdir/file3.txt\n")
+        self.assertEqual(self.find(core, "find -type d"), "Found items:\nanother_subdir\nsubdir\n")
+        self.assertEqual(self.find(core, "find another_subdir -regex .*5.txt"),
+                         "Found items:\nanother_subdir/file5.txt\n")
+        self.assertEqual(self.find(core, "find -size +30c -type f"),
+                         "Found items:\nanother_subdir/file4.txt\nanother_subdir/file5.txt\n")
+        core.execute_command("cd subdir")
+        self.assertEqual(self.find(core, "find -name *.txt"),
+                         "Found items:\nsubdir/file2.txt\nsubdir/file3.txt\n")
+        self.assertEqual(self.find(core, "find -name missing"), "No items found matching: -name missing\n")
+        self.assertEqual(self.find(core, "find -type x"), "find: unknown argument to -type: x\n")
+        self.assertEqual(self.find(core, "find nowhere -type f"), "No such directory: /subdir/nowhere\n")
+
+    def test_size_predicate(self):
+        self.assertTrue(size_predicate("1")(512))
+        self.assertFalse(size_predicate("1")(513))
+        self.assertTrue(size_predicate("+1k")(1025))
+        self.assertTrue(size_predicate("-10c")(9))
+        with self.assertRaises(ValueError):
+            size_predicate("10x")
+
+    def make_stream_archive(self, count):
+        path = tempfile.NamedTemporaryFile(suffix=".tar.gz", delete=False).name
+        self.addCleanup(os.remove, path)
+        with tarfile.open(path, "w:gz") as tar:
+            for i in range(count):
+                info = tarfile.TarInfo(f"dir{i % 3}/file{i}.txt")
+                data = f"file {i}\n".encode()
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return path
+
+    def test_stream_loading(self):
+        path = self.make_stream_archive(STREAM_BATCH * 4)
+        core = ShellCore("test_user", None, path, stream=True)
+        self.assertTrue(core.wait_loaded(10))
+        self.assertEqual(len(core.file_system), STREAM_BATCH * 4)
+        self.assertEqual(core.file_system["dir1/file1.txt"], "file 1\n")
+        self.assertEqual(core.metadata.stat("dir1/file1.txt")["size"], 7)
+        self.assertTrue(core.sink.getvalue().endswith(f"Virtual filesystem loaded from {path}\n"))
+
+    def test_stream_missing_archive(self):
+        core = ShellCore("test_user", None, "/nonexistent.tar", stream=True)
+        self.assertTrue(core.wait_loaded(10))
+        self.assertIn("Error loading virtual filesystem", core.sink.getvalue())
+
+    def test_stream_startup_script(self):
+        path = self.make_stream_archive(STREAM_BATCH * 4)
+        with tempfile.NamedTemporaryFile("w", suffix=".sh", delete=False) as script:
+            script.write("cd dir1\nls\n")
+        self.addCleanup(os.remove, script.name)
+        core = ShellCore("test_user", script.name, path, stream=True)
+        self.assertTrue(core.wait_loaded(10))
+        output = core.sink.getvalue()
+        self.assertNotIn("No such directory", output)
+        self.assertIn("Files in /dir1:\nFiles:\nfile1.txt\n", output)
+
+    def test_commands_during_stream_loading(self):
+        path = self.make_stream_archive(STREAM_BATCH * 2 + 1)
+        GatedCore.ingested = threading.Event()
+        GatedCore.gate = threading.Event()
+        core = GatedCore("test_user", None, path, stream=True)
+        try:
+            self.assertTrue(core.ingested.wait(10))
+            self.assertFalse(core.loaded.is_set())
+            core.execute_command("cd dir0")
+            self.assertEqual(core.current_path, "/dir0")
+            self.assertEqual(len(core.file_system), STREAM_BATCH)
+        finally:
+            core.gate.set()
+        self.assertTrue(core.wait_loaded(10))
+        self.assertEqual(len(core.file_system), STREAM_BATCH * 2 + 1)
+
+    def test_file_sink_buffers(self):
+        output = io.StringIO()
+        sink = FileSink(output, buffer_size=10)
+        sink.write("12345")
+        self.assertEqual(output.getvalue(), "")
+        sink.write("67890")
+        self.assertEqual(output.getvalue(), "1234567890")
+
+    def test_batch_cli(self):
+        directory = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run(
+            [sys.executable, os.path.join(directory, "emulator.py"), "--batch",
+             "--username", "test_user", "--tar_path", self.tar_file.name],
+            input="cd another_subdir\nls\nexit\nls\n", capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.count("Files in"), 1)
+        self.assertIn("file4.txt\nfile5.txt\n", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from vfs import ArchiveIndex, DirectoryTree, LazyFileSystem, LRUCache, MetadataTable, Overlay, index_path
+
+
+def create_tar(path, files, mode="w"):
+    """Создаёт архив из словаря {имя: bytes}."""
+    with tarfile.open(path, mode) as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.uname = "owner"
+            tar.addfile(info, io.BytesIO(data))
+
+
+class TestLazyFileSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.files = {
+            "file1.txt": b"This is file1.txt\n",
+            "subdir/file2.txt": b"This is file2.txt in subdir\n",
+            "bin/blob": bytes(range(256)),
+        }
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+            if os.path.exists(index_path(path)):
+                os.remove(index_path(path))
+
+    def make_archive(self, suffix=".tar", mode="w"):
+        path = tempfile.NamedTemporaryFile(suffix=suffix, delete=False).name
+        self.paths.append(path)
+        create_tar(path, self.files, mode)
+        return path
+
+    def test_index_has_headers_only(self):
+        index = ArchiveIndex(self.make_archive())
+        try:
+            self.assertEqual(set(index.entries), set(self.files))
+            entry = index.entries["subdir/file2.txt"]
+            self.assertEqual(entry.size, len(self.files["subdir/file2.txt"]))
+            self.assertEqual(entry.uname, "owner")
+            self.assertTrue(entry.isfile())
+        finally:
+            index.close()
+
+    def test_read_on_access(self):
+        for suffix, mode in ((".tar", "w"), (".tar.gz", "w:gz")):
+            index = ArchiveIndex(self.make_archive(suffix, mode))
+            try:
+                fs = LazyFileSystem(index)
+                self.assertEqual(fs["subdir/file2.txt"], "This is file2.txt in subdir\n")
+                # Бинарный файл не ломает загрузку и читается с заменой символов
+                self.assertEqual(len(fs["bin/blob"]), 256)
+                self.assertIn("file1.txt", fs)
+                self.assertNotIn("missing.txt", fs)
+            finally:
+                index.close()
+
+    def test_cache_is_used(self):
+        index = ArchiveIndex(self.make_archive())
+        try:
+            fs = LazyFileSystem(index)
+            fs["file1.txt"]
+            self.assertEqual(fs.cache.get("file1.txt"), "This is file1.txt\n")
+        finally:
+            index.close()
+
+    def test_index_cache(self):
+        for suffix, mode in ((".tar", "w"), (".tar.gz", "w:gz")):
+            path = self.make_archive(suffix, mode)
+            ArchiveIndex(path, use_cache=True).close()
+            self.assertTrue(os.path.exists(index_path(path)))
+
+            index = ArchiveIndex(path, use_cache=True)
+            try:
+                self.assertTrue(index.from_cache)
+                self.assertEqual(index.entries["subdir/file2.txt"].uname, "owner")
+                fs = LazyFileSystem(index)
+                self.assertEqual(fs["subdir/file2.txt"], "This is file2.txt in subdir\n")
+            finally:
+                index.close()
+
+    def test_index_cache_invalidation(self):
+        path = self.make_archive()
+        ArchiveIndex(path, use_cache=True).close()
+        self.files["new.txt"] = b"new\n"
+        create_tar(path, self.files)
+
+        index = ArchiveIndex(path, use_cache=True)
+        try:
+            self.assertFalse(index.from_cache)
+            self.assertIn("new.txt", index.entries)
+        finally:
+            index.close()
+
+    def test_lru_eviction(self):
+        cache = LRUCache(max_size=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        cache.get("a")
+        cache.put("c", "123")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "12345")
+        self.assertLessEqual(cache.size, 10)
+        cache.put("huge", "x" * 11)
+        self.assertIsNone(cache.get("huge"))
+
+
+class TestDirectoryTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = DirectoryTree([
+            "file1.txt",
+            "subdir/file2.txt",
+            "subdir/nested/file3.txt",
+            "another_subdir/file4.txt",
+        ])
+
+    def test_listing(self):
+        self.assertEqual(self.tree.listing("/"), (["another_subdir", "subdir"], ["file1.txt"]))
+        self.assertEqual(self.tree.listing("/subdir"), (["nested"], ["file2.txt"]))
+        self.assertEqual(self.tree.listing("/missing"), ([], []))
+
+    def test_lookup(self):
+        self.assertTrue(self.tree.lookup("/").isdir())
+        self.assertTrue(self.tree.lookup("subdir/nested").isdir())
+        self.assertFalse(self.tree.lookup("subdir/file2.txt").isdir())
+        self.assertIsNone(self.tree.lookup("subdir/file2.txt/x"))
+        self.assertIsNone(self.tree.lookup("missing"))
+
+    def test_find_matches_linear_scan(self):
+        paths = ["file1.txt", "subdir/file2.txt", "subdir/nested/file3.txt", "another_subdir/file4.txt"]
+        for pattern in ("file", "subdir", "nested", "3", "missing"):
+            expected = [path for path in paths
+                        if pattern in os.path.basename(path) or pattern in os.path.dirname(path)]
+            self.assertEqual(self.tree.find(pattern), expected)
+
+
+class TestMetadataOverlay(unittest.TestCase):
+
+    def setUp(self):
+        self.journal = tempfile.NamedTemporaryFile(suffix=".journal", delete=False).name
+        os.remove(self.journal)
+        path = tempfile.NamedTemporaryFile(suffix=".tar", delete=False).name
+        try:
+            create_tar(path, {"file1.txt": b"data\n"})
+            index = ArchiveIndex(path)
+            self.entries = index.entries
+            index.close()
+        finally:
+            os.remove(path)
+
+    def tearDown(self):
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+
+    def test_stat_and_update(self):
+        table = MetadataTable(self.entries)
+        self.assertEqual(table.stat("file1.txt")["uname"], "owner")
+        table.update("file1.txt", uname="alice", mode=0o600)
+        self.assertEqual(table.stat("file1.txt")["uname"], "alice")
+        self.assertEqual(table.stat("file1.txt")["size"], 5)
+        self.assertEqual(self.entries["file1.txt"].uname, "owner")
+        self.assertEqual(table.stat("implicit_dir")["uname"], "")
+        with self.assertRaises(ValueError):
+            table.update("file1.txt", content="x")
+
+    def test_journal_replay_and_compact(self):
+        overlay = Overlay(self.journal)
+        table = MetadataTable(self.entries, overlay)
+        for owner in ("alice", "bob", "carol"):
+            table.update("file1.txt", uname=owner)
+        overlay.close()
+
+        overlay = Overlay(self.journal)
+        overlay.close()
+        self.assertEqual(MetadataTable(self.entries, overlay).stat("file1.txt")["uname"], "carol")
+        with open(self.journal) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
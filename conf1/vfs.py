@@ -0,0 +1,494 @@
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import re
+import tarfile
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Entry:
+    """Запись индекса архива: только заголовок tar, без содержимого."""
+    __slots__ = ('name', 'offset', 'size', 'mode', 'uid', 'gid', 'uname', 'gname', 'mtime', 'type')
+
+    def __init__(self, name, offset, size, mode, uid, gid, uname, gname, mtime, type):
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.mode = mode
+        self.uid = uid
+        self.gid = gid
+        self.uname = uname
+        self.gname = gname
+        self.mtime = mtime
+        self.type = type
+
+    @classmethod
+    def from_member(cls, member: tarfile.TarInfo) -> 'Entry':
+        return cls(member.name, member.offset_data, member.size, member.mode, member.uid, member.gid,
+                   member.uname, member.gname, int(member.mtime), member.type)
+
+    @classmethod
+    def from_row(cls, row: list) -> 'Entry':
+        entry = cls(*row)
+        entry.type = entry.type.encode('ascii')
+        return entry
+
+    def to_row(self) -> list:
+        return [self.name, self.offset, self.size, self.mode, self.uid, self.gid,
+                self.uname, self.gname, self.mtime, self.type.decode('ascii')]
+
+    def to_member(self) -> tarfile.TarInfo:
+        """TarInfo, достаточный для extractfile() без повторного обхода архива."""
+        member = tarfile.TarInfo(self.name)
+        member.offset_data = self.offset
+        member.size = self.size
+        member.mode = self.mode
+        member.type = self.type
+        return member
+
+    def isfile(self) -> bool:
+        return self.type in tarfile.REGULAR_TYPES
+
+    def isdir(self) -> bool:
+        return self.type == tarfile.DIRTYPE
+
+
+class LRUCache:
+    """Кэш декодированного содержимого, ограниченный суммарным числом символов."""
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.items: 'OrderedDict[str, str]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str):
+        if key in self.items:
+            self.size -= len(self.items.pop(key))
+        if len(value) > self.max_size:
+            return
+        self.items[key] = value
+        self.size += len(value)
+        while self.size > self.max_size:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+INDEX_SUFFIX = '.index'
+INDEX_VERSION = 1
+# Сколько байт с начала и с конца архива входит в хэш ключа кэша
+HASH_SAMPLE = 64 * 1024
+
+
+def index_path(tar_path: str) -> str:
+    """Путь файла-кэша индекса рядом с архивом."""
+    return tar_path + INDEX_SUFFIX
+
+
+def archive_key(tar_path: str) -> dict:
+    """Ключ кэша: размер, mtime и SHA-256 начала и конца архива.
+
+    Хэшируется не весь файл, а его края: иначе проверка кэша стоила бы
+    столько же, сколько чтение архива целиком.
+    """
+    stat = os.stat(tar_path)
+    digest = hashlib.sha256()
+    with open(tar_path, 'rb') as f:
+        digest.update(f.read(HASH_SAMPLE))
+        if stat.st_size > HASH_SAMPLE:
+            f.seek(max(HASH_SAMPLE, stat.st_size - HASH_SAMPLE))
+            digest.update(f.read(HASH_SAMPLE))
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def load_index(tar_path: str, key: dict) -> Optional[Dict[str, Entry]]:
+    """Таблица членов из кэша или None, если кэша нет или архив изменился."""
+    try:
+        with open(index_path(tar_path), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != INDEX_VERSION or data.get('key') != key:
+        return None
+    entries = {}
+    for row in data['entries']:
+        entry = Entry.from_row(row)
+        entries[entry.name] = entry
+    return entries
+
+
+def save_index(tar_path: str, key: dict, entries: Dict[str, Entry]):
+    """Атомарно записывает кэш; если каталог только для чтения - молча пропускает."""
+    path = index_path(tar_path)
+    data = {'version': INDEX_VERSION, 'key': key,
+            'entries': [entry.to_row() for entry in entries.values()]}
+    try:
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+
+class ArchiveIndex:
+    """Индекс tar-архива: при загрузке читаются только заголовки членов.
+
+    Содержимое файла читается при первом обращении: для несжатого архива
+    срезом из mmap по смещению данных, для сжатого - через открытый tarfile.
+    С use_cache таблица членов берётся из файла рядом с архивом (см.
+    index_path), и архив не обходится, пока не изменится.
+    """
+
+    def __init__(self, tar_path: str, use_cache: bool = False):
+        self.tar_path = tar_path
+        self.entries: Dict[str, Entry] = {}
+        self.from_cache = False
+        self._tar = None
+        self._members = {}
+        self._file = None
+        self._map = None
+        key = archive_key(tar_path) if use_cache else None
+        if key is not None:
+            cached = load_index(tar_path, key)
+            if cached is not None:
+                self.entries = cached
+                self.from_cache = True
+
+        try:
+            tar = tarfile.open(tar_path, 'r:')
+        except tarfile.ReadError:
+            # Сжатый архив: читать по смещению нельзя, держим tarfile открытым
+            self._tar = tarfile.open(tar_path, 'r')
+            if self.from_cache:
+                self._members = {name: entry.to_member() for name, entry in self.entries.items()}
+                return
+            for member in self._tar:
+                self.entries[member.name] = Entry.from_member(member)
+                self._members[member.name] = member
+            if key is not None:
+                save_index(tar_path, key, self.entries)
+            return
+
+        if self.from_cache:
+            tar.close()
+            self._open_map()
+            return
+        with tar:
+            # Итерация по несжатому архиву перескакивает через данные членов
+            for member in tar:
+                self.entries[member.name] = Entry.from_member(member)
+                tar.members = []
+        if key is not None:
+            save_index(tar_path, key, self.entries)
+        self._open_map()
+
+    def _open_map(self):
+        self._file = open(self.tar_path, 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, name: str) -> bytes:
+        entry = self.entries[name]
+        if self._tar is not None:
+            return self._tar.extractfile(self._members[name]).read()
+        return self._map[entry.offset:entry.offset + entry.size]
+
+    def close(self):
+        if self._tar is not None:
+            self._tar.close()
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class LazyFileSystem:
+    """Словарь «путь -> содержимое», который декодирует файлы по требованию.
+
+    Повторяет интерфейс обычного dict, который ShellEmulator использует в
+    неленивом режиме. Записанные значения (например, после chown) хранятся
+    поверх архива и в кэш не попадают.
+    """
+
+    def __init__(self, index: ArchiveIndex, cache_size: int = 16 * 1024 * 1024):
+        self.index = index
+        self.cache = LRUCache(cache_size)
+        self.overrides: Dict[str, object] = {}
+        self.names = [name for name, entry in index.entries.items() if entry.isfile()]
+
+    def __contains__(self, name) -> bool:
+        return name in self.overrides or (name in self.index.entries and self.index.entries[name].isfile())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def keys(self):
+        return self.names
+
+    def __getitem__(self, name: str):
+        if name in self.overrides:
+            return self.overrides[name]
+        if name not in self:
+            raise KeyError(name)
+        content = self.cache.get(name)
+        if content is None:
+            content = self.index.read(name).decode('utf-8', errors='replace')
+            self.cache.put(name, content)
+        return content
+
+    def __setitem__(self, name: str, value):
+        if name not in self:
+            self.names.append(name)
+        self.overrides[name] = value
+
+
+class Node:
+    """Узел дерева каталогов: каталог с детьми или файл с размером."""
+    __slots__ = ('name', 'children', 'order', 'size')
+
+    def __init__(self, name: str, is_dir: bool, order: int = -1, size: int = 0):
+        self.name = name
+        self.children: Optional[Dict[str, 'Node']] = {} if is_dir else None
+        self.order = order
+        self.size = size
+
+    def isdir(self) -> bool:
+        return self.children is not None
+
+
+class DirectoryTree:
+    """Дерево компонентов пути и индекс «базовое имя -> пути».
+
+    ls и cd обходят только компоненты пути, find не перебирает все файлы:
+    проверяются уникальные базовые имена и пути каталогов.
+    """
+
+    def __init__(self, paths: Iterable[str] = (), sizes: Optional[Dict[str, int]] = None):
+        self.root = Node('', True)
+        # Пути каталогов (без ведущего '/') -> узел, корень - пустая строка
+        self.directories: Dict[str, Node] = {'': self.root}
+        # Пути файлов -> узел, базовое имя -> пути файлов и каталогов
+        self.files: Dict[str, Node] = {}
+        self.basenames: Dict[str, List[str]] = {}
+        self.dirnames: Dict[str, List[str]] = {}
+        # Порядковый номер следующего узла: find выдаёт пути в порядке архива
+        self.count = 0
+        sizes = sizes or {}
+        for path in paths:
+            self.add(path, sizes.get(path, 0))
+
+    def add(self, path: str, size: int = 0):
+        """Добавляет файл, создавая недостающие каталоги."""
+        parts = path.split('/')
+        node = self.root
+        for depth, part in enumerate(parts[:-1]):
+            child = node.children.get(part)
+            if child is None:
+                child = Node(part, True, self.count)
+                self.count += 1
+                node.children[part] = child
+                directory = '/'.join(parts[:depth + 1])
+                self.directories[directory] = child
+                self.dirnames.setdefault(part, []).append(directory)
+            node = child
+        if parts[-1] not in node.children:
+            node.children[parts[-1]] = self.files[path] = Node(parts[-1], False, self.count, size)
+            self.basenames.setdefault(parts[-1], []).append(path)
+            self.count += 1
+
+    def lookup(self, path: str) -> Optional[Node]:
+        """Узел по пути относительно корня ('' или '/' - корень)."""
+        node = self.root
+        for part in path.strip('/').split('/'):
+            if not part:
+                continue
+            if not node.isdir():
+                return None
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def listing(self, path: str) -> Tuple[List[str], List[str]]:
+        """Отсортированные имена подкаталогов и файлов каталога."""
+        node = self.lookup(path)
+        if node is None or not node.isdir():
+            return [], []
+        directories = sorted(name for name, child in node.children.items() if child.isdir())
+        files = sorted(name for name, child in node.children.items() if not child.isdir())
+        return directories, files
+
+    def find(self, pattern: str) -> List[str]:
+        """Пути файлов, у которых pattern входит в базовое имя или в путь каталога.
+
+        Порядок - порядок добавления файлов, как при переборе архива.
+        """
+        found = {}
+        for name, paths in self.basenames.items():
+            if pattern in name:
+                for path in paths:
+                    found[path] = self.files[path].order
+        for directory, node in self.directories.items():
+            if pattern in directory:
+                for name, child in node.children.items():
+                    if not child.isdir():
+                        found[f'{directory}/{name}' if directory else name] = child.order
+        return sorted(found, key=found.get)
+
+    def walk(self, path: str, node: Node) -> Iterator[Tuple[str, Node]]:
+        """Все узлы поддерева (без самого node) с путями от корня."""
+        stack = [(path, node)]
+        while stack:
+            path, node = stack.pop()
+            for name, child in node.children.items():
+                child_path = f'{path}/{name}' if path else name
+                yield child_path, child
+                if child.isdir():
+                    stack.append((child_path, child))
+
+    def query(self, scope: str = '', name: Optional[str] = None, regex: Optional[str] = None,
+              type: Optional[str] = None, size=None) -> Optional[List[str]]:
+        """Пути узлов под scope, удовлетворяющих всем заданным условиям.
+
+        name - glob по базовому имени, regex - полное совпадение с путём,
+        type - 'f' или 'd', size - функция от размера файла. С name
+        в корне кандидаты берутся из индексов базовых имён, без обхода дерева.
+        Возвращает None, если scope не существует.
+        """
+        scope = scope.strip('/')
+        base = self.lookup(scope)
+        if base is None:
+            return None
+        pattern = re.compile(regex) if regex is not None else None
+
+        # Кандидаты из индекса имён уже совпадают с name, повторно не проверяются
+        check_name = name
+        if not base.isdir():
+            candidates = [(scope, base)]
+        elif name is not None and (not scope or not any(char in name for char in '*?[')):
+            if any(char in name for char in '*?['):
+                names = set(fnmatch.filter(self.basenames, name)) | set(fnmatch.filter(self.dirnames, name))
+            else:
+                names = {name}
+            prefix = scope + '/' if scope else ''
+            check_name = None
+            candidates = []
+            for matched in names:
+                if type != 'd':
+                    candidates.extend((path, self.files[path]) for path in self.basenames.get(matched, ())
+                                      if path.startswith(prefix))
+                if type != 'f':
+                    candidates.extend((path, self.directories[path]) for path in self.dirnames.get(matched, ())
+                                      if path.startswith(prefix))
+        else:
+            candidates = self.walk(scope, base)
+
+        found = []
+        for path, node in candidates:
+            if check_name is not None and not fnmatch.fnmatchcase(node.name, check_name):
+                continue
+            if type is not None and (type == 'd') != node.isdir():
+                continue
+            if size is not None and (node.isdir() or not size(node.size)):
+                continue
+            if pattern is not None and not pattern.fullmatch(path):
+                continue
+            found.append((node.order, path))
+        found.sort()
+        return [path for _, path in found]
+
+
+class Overlay:
+    """Изменения метаданных поверх архива, который только читается.
+
+    Хранит по каждому пути только изменённые поля. С journal_path каждая
+    правка дописывается строкой JSON в журнал, а при открытии журнал
+    проигрывается заново.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None):
+        self.journal_path = journal_path
+        self.changes: Dict[str, Dict[str, object]] = {}
+        self._journal = None
+        if journal_path is None:
+            return
+        records = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    self.changes.setdefault(record['path'], {}).update(record['set'])
+                    records += 1
+        # Журнал, где одни и те же пути правились много раз, переписывается сжатым
+        if records > 2 * len(self.changes):
+            self.compact()
+        self._journal = open(journal_path, 'a')
+
+    def record(self, path: str, **fields):
+        self.changes.setdefault(path, {}).update(fields)
+        if self._journal is not None:
+            self._journal.write(json.dumps({'path': path, 'set': fields}) + '\n')
+            self._journal.flush()
+
+    def get(self, path: str) -> Dict[str, object]:
+        return self.changes.get(path, {})
+
+    def compact(self):
+        """Переписывает журнал: по одной записи на путь."""
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            for path, fields in self.changes.items():
+                f.write(json.dumps({'path': path, 'set': fields}) + '\n')
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(temp_path, self.journal_path)
+        if self._journal is not None:
+            self._journal = open(self.journal_path, 'a')
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class MetadataTable:
+    """Владелец, права и время изменения из заголовков tar плюс overlay.
+
+    Содержимое файлов здесь не хранится, поэтому chown и другие правки
+    метаданных стоят O(1) и не трогают данные.
+    """
+    FIELDS = ('uname', 'gname', 'uid', 'gid', 'mode', 'mtime', 'size')
+
+    def __init__(self, entries: Dict[str, Entry], overlay: Optional[Overlay] = None):
+        self.entries = entries
+        self.overlay = overlay if overlay is not None else Overlay()
+
+    def stat(self, path: str) -> Dict[str, object]:
+        """Поля заголовка с применёнными изменениями; каталогам без
+        собственного заголовка достаются пустые значения."""
+        entry = self.entries.get(path)
+        if entry is None:
+            info = {'uname': '', 'gname': '', 'uid': 0, 'gid': 0, 'mode': 0o755, 'mtime': 0, 'size': 0}
+        else:
+            info = {field: getattr(entry, field) for field in self.FIELDS}
+        info.update(self.overlay.get(path))
+        return info
+
+    def update(self, path: str, **fields):
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(sorted(unknown))}")
+        self.overlay.record(path, **fields)
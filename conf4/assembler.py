@@ -1,6 +1,31 @@
+import argparse
 import struct
 import yaml
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import codec
+
+# Размер буфера записи для потоковой сборки
+BUFFER_SIZE = 1 << 16
+
+
+def format_log_entry(opcode: int, operand: int, encoded: bytes) -> str:
+    """Запись лога в том же виде, в каком её выводит yaml.dump."""
+    return (
+        '- instruction:\n'
+        f'    opcode: A={opcode}\n'
+        f'    operand: B={operand}\n'
+        f'    binary: bytes=[{", ".join(hex(b) for b in encoded)}]\n'
+    )
+
+
+def format_removed_entry(entry: Dict) -> str:
+    """Запись об удалённой оптимизатором команде в формате yaml.dump."""
+    return (
+        f'- line: {entry["line"]}\n'
+        f'  instruction: {entry["instruction"]}\n'
+        f'  reason: {entry["reason"]}\n'
+    )
 
 class Instruction:
     # Opcodes
@@ -28,7 +53,7 @@ class Instruction:
             first_byte = self.opcode & 0x1F
             
             # Сдвигаем операнд на 5 бит влево (освобождаем место для опкода)
-            shifted_operand = (self.operand << 5) & 0xFFFFFFFF
+            shifted_operand = (self.operand << 5) & 0xFFFFFFFFFF
             
             # Комбинируем опкод и операнд
             combined = first_byte | shifted_operand
@@ -55,9 +80,15 @@ class Instruction:
 
 
 class Assembler:
-    def __init__(self):
+    # Команды, которые перезаписывают аккумулятор, не читая его
+    ACCUMULATOR_SETTERS = (Instruction.LOAD_CONST, Instruction.MEMORY_READ)
+
+    def __init__(self, optimize: bool = False):
         self.instructions: List[Instruction] = []
         self.log_entries: List[Dict] = []
+        # Включает peephole-оптимизацию между разбором и кодированием
+        self.optimize = optimize
+        self.removed: List[Dict] = []
         # Словарь мнемоник и их опкодов
         self.mnemonics = {
             'LOAD': Instruction.LOAD_CONST,    # 14
@@ -65,6 +96,7 @@ class Assembler:
             'WRITE': Instruction.MEMORY_WRITE, # 15
             'MIN': Instruction.MIN_OP         # 20
         }
+        self.names = {opcode: mnemonic for mnemonic, opcode in self.mnemonics.items()}
 
     def parse_line(self, line: str) -> Tuple[int, int]:
         # Remove comments and strip whitespace
@@ -85,32 +117,90 @@ class Assembler:
         operand = int(parts[1])
         return opcode, operand
 
+    def parse_source(self, lines: Iterable[str]) -> Iterator[Tuple[int, int, int]]:
+        """Разбирает строки исходника в тройки (номер строки, опкод, операнд)."""
+        for line_number, line in enumerate(lines, 1):
+            result = self.parse_line(line)
+            if result is not None:
+                yield (line_number,) + result
+
+    def _redundant(self, last: Optional[Tuple[int, int, int]], opcode: int, operand: int) -> Optional[str]:
+        """Причина, по которой команда не нужна после last, или None."""
+        if last is None or last[2] != operand:
+            return None
+        previous = last[1]
+        if previous == Instruction.MEMORY_WRITE and opcode == Instruction.MEMORY_READ:
+            return 'read after write of the same address'
+        if previous == Instruction.MEMORY_WRITE and opcode == Instruction.MEMORY_WRITE:
+            return 'repeated write'
+        if previous == Instruction.MEMORY_READ and opcode == Instruction.MEMORY_WRITE:
+            return 'write back of the value just read'
+        if previous == Instruction.MEMORY_READ and opcode == Instruction.MIN_OP:
+            return 'min with the value just read'
+        if previous == Instruction.MIN_OP and opcode == Instruction.MIN_OP:
+            return 'repeated min'
+        return None
+
+    def peephole(self, parsed: Iterable[Tuple[int, int, int]]) -> Iterator[Tuple[int, int, int]]:
+        """Удаляет команды, не влияющие на итоговое состояние памяти.
+
+        Последняя команда придерживается до прихода следующей: загрузку в
+        аккумулятор, которую сразу перезаписывает LOAD/READ, можно выбросить.
+        Удалённые команды копятся в self.removed для лога.
+        """
+        pending = None  # последняя принятая, ещё не выданная команда
+        emitted = None  # последняя выданная команда
+
+        def remove(item, reason):
+            line_number, opcode, operand = item
+            self.removed.append({
+                'line': line_number,
+                'instruction': f'{self.names[opcode]} {operand}',
+                'reason': reason,
+            })
+
+        for item in parsed:
+            _, opcode, operand = item
+            if pending is not None and pending[1] in self.ACCUMULATOR_SETTERS \
+                    and opcode in self.ACCUMULATOR_SETTERS:
+                remove(pending, 'dead accumulator load')
+                pending = None
+
+            reason = self._redundant(pending if pending is not None else emitted, opcode, operand)
+            if reason:
+                remove(item, reason)
+                continue
+
+            if pending is not None:
+                yield pending
+                emitted = pending
+            pending = item
+
+        if pending is not None:
+            yield pending
+
     def assemble(self, source_path: str, output_path: str, log_path: str):
         instructions = []
-        
+        self.removed = []
+
         # Read and parse source file
         with open(source_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith(';'):
-                    continue
-                    
-                result = self.parse_line(line)
-                if result is None:
-                    continue
-                    
-                opcode, operand = result
-                instruction = Instruction(opcode, operand)
-                instructions.append(instruction)
-                
-                # Отладочный вывод для всех команд
-                print(f"Assembled: opcode={opcode}, operand={operand}")
-                print(f"Binary: {' '.join(hex(b) for b in instruction.encode())}")
+            parsed = list(self.parse_source(f))
+        if self.optimize:
+            parsed = list(self.peephole(parsed))
+
+        for _, opcode, operand in parsed:
+            instruction = Instruction(opcode, operand)
+            instructions.append(instruction)
+
+            # Отладочный вывод для всех команд
+            print(f"Assembled: opcode={opcode}, operand={operand}")
+            print(f"Binary: {' '.join(hex(b) for b in instruction.encode())}")
 
         # Write binary file
         with open(output_path, 'wb') as f:
-            for instruction in instructions:
-                f.write(instruction.encode())
+            f.write(codec.encode([instruction.opcode for instruction in instructions],
+                                 [instruction.operand for instruction in instructions]))
                 
         # Write log file
         log_entries = []
@@ -125,17 +215,67 @@ class Assembler:
             }
             log_entries.append(entry)
             
+        log = {'instructions': log_entries}
+        if self.optimize:
+            log['removed'] = self.removed
         with open(log_path, 'w') as f:
-            yaml.dump({'instructions': log_entries}, f, sort_keys=False)
+            yaml.dump(log, f, sort_keys=False)
+
+    def assemble_stream(self, source_path: str, output_path: str, log_path: str) -> int:
+        """Потоковая сборка: исходник читается построчно, каждая команда
+        кодируется один раз и сразу пишется в бинарный файл и в лог.
+
+        Результат совпадает с assemble(), но память не зависит от размера
+        программы (кроме списка удалённых команд при оптимизации).
+        Возвращает число собранных команд.
+        """
+        count = 0
+        self.removed = []
+        with open(source_path, 'r') as source, \
+             open(output_path, 'wb', buffering=BUFFER_SIZE) as output, \
+             open(log_path, 'w', buffering=BUFFER_SIZE) as log:
+            parsed = self.parse_source(source)
+            if self.optimize:
+                parsed = self.peephole(parsed)
+
+            for _, opcode, operand in parsed:
+                encoded = Instruction(opcode, operand).encode()
+                output.write(encoded)
+
+                if count == 0:
+                    log.write('instructions:\n')
+                log.write(format_log_entry(opcode, operand, encoded))
+                count += 1
+
+            if count == 0:
+                log.write('instructions: []\n')
+
+            if self.optimize:
+                if not self.removed:
+                    log.write('removed: []\n')
+                else:
+                    log.write('removed:\n')
+                    for entry in self.removed:
+                        log.write(format_removed_entry(entry))
+
+        return count
 
 def main():
-    import sys
-    if len(sys.argv) != 4:
-        print("Usage: python assembler.py <source_file> <output_file> <log_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='UVM assembler')
+    parser.add_argument('source_file', help='Path to the .asm source')
+    parser.add_argument('output_file', help='Path to the output binary')
+    parser.add_argument('log_file', help='Path to the YAML log')
+    parser.add_argument('--stream', action='store_true',
+                        help='Assemble line by line with constant memory use')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Remove redundant instructions with a peephole pass')
+    args = parser.parse_args()
 
-    assembler = Assembler()
-    assembler.assemble(sys.argv[1], sys.argv[2], sys.argv[3])
+    assembler = Assembler(optimize=args.optimize)
+    if args.stream:
+        assembler.assemble_stream(args.source_file, args.output_file, args.log_file)
+    else:
+        assembler.assemble(args.source_file, args.output_file, args.log_file)
 
 if __name__ == '__main__':
     main()
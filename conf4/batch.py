@@ -0,0 +1,82 @@
+import argparse
+import numpy as np
+import yaml
+
+from interpreter import LOAD_CONST, MEMORY_READ, MEMORY_WRITE, MIN_OP, iter_chunks, open_binary
+
+
+class BatchUVMInterpreter:
+    """Исполняет одну программу сразу для N экземпляров УВМ.
+
+    Память хранится одним массивом формы (memory_size, N): строка - адрес,
+    столбец - экземпляр, поэтому каждая команда становится одной векторной
+    операцией над непрерывной строкой.
+    """
+
+    def __init__(self, memories: np.ndarray):
+        memories = np.asarray(memories, dtype=np.int64)
+        if memories.ndim != 2:
+            raise ValueError(f"Expected 2-D array of memories, got shape {memories.shape}")
+        self.memory = np.ascontiguousarray(memories.T)
+        self.accumulator = np.zeros(memories.shape[0], dtype=np.int64)
+
+    @classmethod
+    def zeros(cls, count: int, memory_size: int = 1024) -> 'BatchUVMInterpreter':
+        return cls(np.zeros((count, memory_size), dtype=np.int64))
+
+    @property
+    def memories(self) -> np.ndarray:
+        """Память в виде (N, memory_size), по строке на экземпляр."""
+        return self.memory.T
+
+    def run(self, opcodes, operands):
+        """Исполняет предекодированную программу для всех экземпляров."""
+        memory = self.memory
+        acc = self.accumulator
+        size = memory.shape[0]
+        for opcode, operand in zip(opcodes, operands):
+            if opcode != LOAD_CONST and not 0 <= operand < size:
+                raise ValueError(f"Invalid memory address: {operand}")
+
+        for opcode, operand in zip(opcodes, operands):
+            if opcode == LOAD_CONST:
+                acc.fill(operand)
+            elif opcode == MEMORY_READ:
+                acc[:] = memory[operand]
+            elif opcode == MEMORY_WRITE:
+                memory[operand] = acc
+            elif opcode == MIN_OP:
+                np.minimum(acc, memory[operand], out=acc)
+
+    def execute(self, binary_path: str, start_addr: int, end_addr: int, output_path: str):
+        with open_binary(binary_path) as binary_data:
+            for opcodes, operands in iter_chunks(binary_data):
+                self.run(opcodes, operands)
+
+        values = self.memories[:, start_addr:end_addr+1].tolist()
+        result = {
+            'runs': [
+                {'memory_range': {'start': start_addr, 'end': end_addr, 'values': run_values}}
+                for run_values in values
+            ]
+        }
+
+        with open(output_path, 'w') as f:
+            yaml.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched UVM interpreter')
+    parser.add_argument('binary_file', help='Path to the assembled binary')
+    parser.add_argument('memories_file', help='.npy file with initial memories, shape (N, memory_size)')
+    parser.add_argument('start_addr', type=int, help='First memory address to dump')
+    parser.add_argument('end_addr', type=int, help='Last memory address to dump')
+    parser.add_argument('output_file', help='Path to the YAML result file')
+    args = parser.parse_args()
+
+    interpreter = BatchUVMInterpreter(np.load(args.memories_file))
+    interpreter.execute(args.binary_file, args.start_addr, args.end_addr, args.output_file)
+
+
+if __name__ == '__main__':
+    main()
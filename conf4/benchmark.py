@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import yaml
+from contextlib import redirect_stdout
+from io import StringIO
+
+import codec
+import compiler
+from assembler import Assembler, Instruction
+from interpreter import UVMInterpreter, decode_program
+
+# Размеры программ и наборы весов (LOAD, READ, WRITE, MIN) для набора замеров
+SUITE_SIZES = (1000, 10000, 100000)
+SUITE_MIXES = {
+    'uniform': (1, 1, 1, 1),
+    'load_store': (4, 0, 4, 0),
+    'memory': (1, 3, 2, 3),
+}
+SUITE_VERSION = 1
+
+
+def generate_program(count: int, seed: int = 0, memory_size: int = 1024) -> bytes:
+    """Генерирует случайную программу из count команд со смесью всех опкодов."""
+    opcodes, operands = generate_instructions(count, seed, memory_size)
+    return codec.encode(opcodes, operands)
+
+
+def generate_instructions(count: int, seed: int = 0, memory_size: int = 1024, weights=None):
+    """Случайные списки опкодов и операндов для генерации программ.
+
+    weights задаёт относительные частоты LOAD, READ, WRITE и MIN.
+    """
+    rng = random.Random(seed)
+    choices = [Instruction.LOAD_CONST, Instruction.MEMORY_READ,
+               Instruction.MEMORY_WRITE, Instruction.MIN_OP]
+    opcodes = rng.choices(choices, weights=weights, k=count)
+    operands = []
+    for opcode in opcodes:
+        if opcode == Instruction.LOAD_CONST:
+            operands.append(rng.randrange(0x1FFFFFFF + 1))
+        else:
+            operands.append(rng.randrange(memory_size))
+    return opcodes, operands
+
+
+def best_of(run, repeat: int) -> float:
+    """Лучшее время из repeat запусков, в секундах."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_engines(count: int, repeat: int = 3):
+    """Сравнивает движки интерпретатора на одной и той же программе."""
+    binary_data = generate_program(count)
+    results = {}
+
+    results['reference'] = best_of(lambda: UVMInterpreter().run_reference(binary_data), repeat)
+    results['threaded'] = best_of(lambda: UVMInterpreter().run_threaded(*decode_program(binary_data)), repeat)
+    # Декодирование один раз, повторные прогоны только исполняют
+    program = decode_program(binary_data)
+    results['predecoded'] = best_of(lambda: UVMInterpreter().run_threaded(*program), repeat)
+    # Первый прогон компилирует программу, остальные берут её из кэша
+    results['compiled'] = best_of(lambda: UVMInterpreter().run_compiled(binary_data), repeat)
+    return results
+
+
+def bench_codec(count: int, repeat: int = 3):
+    """Замеряет пакетное кодирование и декодирование против скалярного пути."""
+    opcodes, operands = generate_instructions(count)
+    binary_data = codec.encode(opcodes, operands)
+    results = {}
+
+    results['scalar encode'] = best_of(
+        lambda: b''.join(Instruction(op, arg).encode() for op, arg in zip(opcodes, operands)), repeat)
+    results['bulk encode'] = best_of(lambda: codec.encode(opcodes, operands), repeat)
+    results['scalar decode'] = best_of(lambda: codec._decode_scalar(binary_data, 0, -1), repeat)
+    results['bulk decode'] = best_of(lambda: codec.decode(binary_data), repeat)
+    return results
+
+
+def write_source(path: str, opcodes, operands):
+    """Записывает программу в виде исходника на ассемблере."""
+    names = {opcode: mnemonic for mnemonic, opcode in Assembler().mnemonics.items()}
+    with open(path, 'w') as f:
+        for opcode, operand in zip(opcodes, operands):
+            f.write(f"{names[opcode]} {operand}\n")
+
+
+def bench_case(directory: str, mix: str, size: int, repeat: int = 3, seed: int = 0) -> dict:
+    """Все замеры для одной программы заданного размера и состава."""
+    opcodes, operands = generate_instructions(size, seed, weights=SUITE_MIXES[mix])
+    source = os.path.join(directory, f'{mix}-{size}.asm')
+    binary = os.path.join(directory, f'{mix}-{size}.bin')
+    log = os.path.join(directory, f'{mix}-{size}.log')
+    output = os.path.join(directory, f'{mix}-{size}.yaml')
+    write_source(source, opcodes, operands)
+
+    def assemble():
+        with redirect_stdout(StringIO()):
+            Assembler().assemble(source, binary, log)
+
+    result = {'mix': mix, 'size': size}
+    result['assemble_s'] = best_of(assemble, repeat)
+    result['assemble_stream_s'] = best_of(lambda: Assembler().assemble_stream(source, binary, log), repeat)
+
+    # Стоимость YAML-лога отдельно от кодирования
+    entries = [{'instruction': {'opcode': f'A={op}', 'operand': f'B={arg}', 'binary': 'bytes=[]'}}
+               for op, arg in zip(opcodes, operands)]
+    result['log_yaml_s'] = best_of(lambda: yaml.dump({'instructions': entries}, sort_keys=False), repeat)
+
+    with open(binary, 'rb') as f:
+        binary_data = f.read()
+    result['bytes'] = len(binary_data)
+    result['decode_s'] = best_of(lambda: codec.decode(binary_data), repeat)
+
+    # Компиляция замеряется отдельно, движок compiled - уже на тёплом кэше
+    compiler._cache.clear()
+    result['compile_s'] = best_of(lambda: compiler.compile_program(binary_data), 1)
+
+    program = decode_program(binary_data)
+    engines = {
+        'reference': lambda: UVMInterpreter().run_reference(binary_data),
+        'threaded': lambda: UVMInterpreter().run_threaded(*program),
+        'compiled': lambda: UVMInterpreter().run_compiled(binary_data),
+    }
+    result['instructions_per_s'] = {}
+    for engine, run in engines.items():
+        result['instructions_per_s'][engine] = round(size / best_of(run, repeat))
+
+    # Пиковая память Python при полном запуске через execute()
+    tracemalloc.start()
+    try:
+        UVMInterpreter().execute(binary, 0, 1023, output, engine='threaded')
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    values = {'memory_range': {'start': 0, 'end': 1023, 'values': list(range(1024))}}
+    result['output_yaml_s'] = best_of(lambda: yaml.dump(values), repeat)
+    return result
+
+
+def run_suite(sizes=SUITE_SIZES, mixes=tuple(SUITE_MIXES), repeat: int = 3, seed: int = 0) -> dict:
+    """Прогоняет весь набор замеров и возвращает результат для JSON."""
+    directory = tempfile.mkdtemp(prefix='uvm-bench-')
+    try:
+        results = [bench_case(directory, mix, size, repeat, seed) for mix in mixes for size in sizes]
+    finally:
+        shutil.rmtree(directory)
+    return {
+        'meta': {
+            'suite_version': SUITE_VERSION,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'numpy': codec.np is not None,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """Сравнивает два результата run_suite: отношение текущего к базовому."""
+    previous = {(result['mix'], result['size']): result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        base = previous.get((result['mix'], result['size']))
+        if base is None:
+            continue
+        for key in ('assemble_s', 'assemble_stream_s', 'decode_s', 'compile_s'):
+            rows.append((result['mix'], result['size'], key, result[key] / base[key]))
+        for engine, rate in result['instructions_per_s'].items():
+            if engine in base['instructions_per_s']:
+                rows.append((result['mix'], result['size'], engine, base['instructions_per_s'][engine] / rate))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UVM interpreter benchmark')
+    parser.add_argument('--count', type=int, default=200000, help='Number of instructions')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per engine, best is reported')
+    parser.add_argument('--codec', action='store_true', help='Benchmark the bulk codec instead of engines')
+    parser.add_argument('--suite', action='store_true',
+                        help='Run the full toolchain suite and print JSON results')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SUITE_SIZES),
+                        help='Program sizes for --suite')
+    parser.add_argument('--output', help='Write --suite JSON to this file instead of stdout')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier --suite run to compare against')
+    args = parser.parse_args()
+
+    if args.suite:
+        results = run_suite(args.sizes, repeat=args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            # Отношение времени: больше 1 - медленнее базовой версии
+            for mix, size, key, ratio in compare(baseline, results):
+                print(f"{mix:>10} {size:>8} {key:>17}: x{ratio:.2f}", file=sys.stderr)
+        return
+
+    if args.codec:
+        results = bench_codec(args.count, args.repeat)
+        for name, seconds in results.items():
+            print(f"{name:>13}: {seconds:.3f}s  {args.count / seconds:,.0f} instr/s")
+        return
+
+    results = bench_engines(args.count, args.repeat)
+    for engine, seconds in results.items():
+        rate = args.count / seconds
+        speedup = results['reference'] / seconds
+        print(f"{engine:>10}: {seconds:.3f}s  {rate:,.0f} instr/s  x{speedup:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import os
+import struct
+import zlib
+from array import array
+from typing import NamedTuple
+
+from memory import BACKENDS, PagedMemory
+
+# Заголовок снимка: сигнатура, версия, вид памяти, размер памяти, pc,
+# смещение следующей команды, аккумулятор, SHA-256 программы, длина данных
+SNAPSHOT_MAGIC = b'UVMS'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<4sHBxIQQq32sI')
+PAGE = struct.Struct('<I')
+
+
+class Snapshot(NamedTuple):
+    pc: int
+    offset: int
+    accumulator: int
+    memory: object
+    digest: bytes
+
+
+def _pack_memory(memory) -> bytes:
+    if isinstance(memory, PagedMemory):
+        parts = [bytes([memory.page_bits]), PAGE.pack(len(memory.pages))]
+        for index in sorted(memory.pages):
+            parts.append(PAGE.pack(index))
+            parts.append(memory.pages[index].tobytes())
+        return b''.join(parts)
+    return array('q', memory).tobytes()
+
+
+def _unpack_memory(backend: str, size: int, data: bytes):
+    if backend == 'paged':
+        memory = PagedMemory(size, page_bits=data[0])
+        (count,) = PAGE.unpack_from(data, 1)
+        page_bytes = 8 << memory.page_bits
+        pos = 1 + PAGE.size
+        for _ in range(count):
+            (index,) = PAGE.unpack_from(data, pos)
+            pos += PAGE.size
+            memory.pages[index] = array('q', data[pos:pos + page_bytes])
+            pos += page_bytes
+        return memory
+
+    values = array('q', data)
+    if len(values) != size:
+        raise ValueError(f"Snapshot memory has {len(values)} cells, expected {size}")
+    return values if backend == 'dense' else values.tolist()
+
+
+def memory_backend(memory) -> str:
+    if isinstance(memory, PagedMemory):
+        return 'paged'
+    if isinstance(memory, array):
+        return 'dense'
+    return 'list'
+
+
+def save_snapshot(path: str, snapshot: Snapshot):
+    """Атомарно записывает снимок: сначала во временный файл, затем rename."""
+    backend = memory_backend(snapshot.memory)
+    payload = zlib.compress(_pack_memory(snapshot.memory))
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, BACKENDS.index(backend),
+                         len(snapshot.memory), snapshot.pc, snapshot.offset,
+                         snapshot.accumulator, snapshot.digest, len(payload))
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"Not a UVM snapshot: {path}")
+        magic, version, backend, size, pc, offset, accumulator, digest, length = HEADER.unpack(header)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a UVM snapshot: {path}")
+        payload = f.read(length)
+
+    memory = _unpack_memory(BACKENDS[backend], size, zlib.decompress(payload))
+    return Snapshot(pc, offset, accumulator, memory, digest)
@@ -0,0 +1,157 @@
+# Пакетное кодирование и декодирование команд УВМ.
+# Формат: опкод в битах 0-4, операнд начиная с бита 5. LOAD_CONST занимает
+# 5 байт (29-битная константа), остальные команды - 3 байта (17-битный адрес).
+# Если установлен NumPy, массивы команд обрабатываются векторно, иначе
+# используется путь на чистом Python с тем же результатом.
+from array import array
+from typing import Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy необязателен
+    np = None
+
+LOAD_CONST = 14
+MEMORY_READ = 25
+MEMORY_WRITE = 15
+MIN_OP = 20
+OPCODES = (LOAD_CONST, MEMORY_READ, MEMORY_WRITE, MIN_OP)
+
+CONST_MASK = 0x1FFFFFFF  # 29 бит
+ADDRESS_MASK = 0x1FFFF   # 17 бит
+
+# Длина команды по её первому байту; 0 - неизвестный опкод
+LENGTHS = tuple(5 if byte & 0x1F == LOAD_CONST else 3 if byte & 0x1F in OPCODES else 0
+                for byte in range(256))
+
+
+def _check(opcode: int, operand: int):
+    if opcode not in OPCODES:
+        raise ValueError(f"Invalid opcode: {opcode}")
+    if opcode == LOAD_CONST:
+        if operand < 0 or operand > CONST_MASK:
+            raise ValueError(f"Constant must be 0-536870911 (29 bits), got {operand}")
+    elif operand < 0 or operand > ADDRESS_MASK:
+        raise ValueError(f"Address must be 0-131071 (17 bits), got {operand}")
+
+
+def encode_one(opcode: int, operand: int) -> bytes:
+    """Кодирует одну команду."""
+    _check(opcode, operand)
+    return (opcode | (operand << 5)).to_bytes(5 if opcode == LOAD_CONST else 3, 'little')
+
+
+def encode(opcodes: Sequence[int], operands: Sequence[int]) -> bytes:
+    """Кодирует массивы опкодов и операндов в бинарную программу."""
+    if len(opcodes) != len(operands):
+        raise ValueError(f"Got {len(opcodes)} opcodes and {len(operands)} operands")
+    if np is None:
+        return b''.join(encode_one(opcode, operand) for opcode, operand in zip(opcodes, operands))
+
+    ops = np.asarray(opcodes, dtype=np.int64)
+    args = np.asarray(operands, dtype=np.int64)
+    is_load = ops == LOAD_CONST
+
+    valid = np.isin(ops, OPCODES)
+    limits = np.where(is_load, CONST_MASK, ADDRESS_MASK)
+    bad = ~valid | (args < 0) | (args > limits)
+    if bad.any():
+        # Сообщение об ошибке берём из скалярной проверки первой плохой команды
+        index = int(np.argmax(bad))
+        _check(int(ops[index]), int(args[index]))
+
+    words = (ops | (args << 5)).astype(np.uint64)
+    lengths = np.where(is_load, 5, 3)
+    starts = np.cumsum(lengths) - lengths
+    out = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    for k in range(3):
+        out[starts + k] = (words >> np.uint64(8 * k)) & np.uint64(0xFF)
+    for k in range(3, 5):
+        out[starts[is_load] + k] = (words[is_load] >> np.uint64(8 * k)) & np.uint64(0xFF)
+    return out.tobytes()
+
+
+def _decode_scalar(binary_data, pos: int, count: int) -> Tuple[array, array, int]:
+    opcodes = array('B')
+    operands = array('q')
+    append_opcode = opcodes.append
+    append_operand = operands.append
+    from_bytes = int.from_bytes
+
+    size = len(binary_data)
+    while pos < size and count != 0:
+        opcode = binary_data[pos] & 0x1F
+
+        if opcode == LOAD_CONST:  # 5 bytes, операнд в битах 5-33
+            end = pos + 5
+            operand = (from_bytes(binary_data[pos:end], 'little') >> 5) & CONST_MASK
+        elif opcode == MEMORY_READ or opcode == MEMORY_WRITE or opcode == MIN_OP:  # 3 bytes, операнд в битах 5-21
+            end = pos + 3
+            operand = (from_bytes(binary_data[pos:end], 'little') >> 5) & ADDRESS_MASK
+        else:
+            raise ValueError(f"Unknown opcode: {opcode}")
+
+        append_opcode(opcode)
+        append_operand(operand)
+        pos = end
+        count -= 1
+
+    # Обрезанной может оказаться только последняя команда
+    if pos > size:
+        raise ValueError(f"Truncated instruction at end of program ({size} bytes)")
+
+    return opcodes, operands, pos
+
+
+def _decode_numpy(binary_data, pos: int, count: int) -> Tuple[array, array, int]:
+    # Границы команд зависят от опкодов, поэтому их находим последовательно,
+    # а поля всех найденных команд извлекаем векторно. Неизвестный опкод
+    # отсекается здесь же: после frombuffer исключение держало бы ссылку на
+    # буфер в кадре, и mmap в open_binary не смог бы закрыться
+    starts = array('q')
+    append_start = starts.append
+    lengths = LENGTHS
+    size = len(binary_data)
+    first = pos
+    while pos < size and count != 0:
+        length = lengths[binary_data[pos]]
+        if not length:
+            raise ValueError(f"Unknown opcode: {binary_data[pos] & 0x1F}")
+        append_start(pos)
+        pos += length
+        count -= 1
+
+    if not starts:
+        return array('B'), array('q'), pos
+    if pos > size:
+        raise ValueError(f"Truncated instruction at end of program ({size} bytes)")
+
+    data = np.frombuffer(binary_data, dtype=np.uint8, count=pos - first, offset=first)
+    index = np.frombuffer(starts, dtype=np.int64) - first
+
+    ops = data[index] & 0x1F
+    words = (data[index].astype(np.int64)
+             | (data[index + 1].astype(np.int64) << 8)
+             | (data[index + 2].astype(np.int64) << 16))
+    is_load = ops == LOAD_CONST
+    load_index = index[is_load]
+    words[is_load] |= ((data[load_index + 3].astype(np.int64) << 24)
+                       | (data[load_index + 4].astype(np.int64) << 32))
+    args = (words >> 5) & np.where(is_load, CONST_MASK, ADDRESS_MASK)
+
+    opcodes = array('B', ops.tobytes())
+    operands = array('q')
+    operands.frombytes(args.astype(np.int64).tobytes())
+    return opcodes, operands, pos
+
+
+def decode(binary_data, pos: int = 0, count: Optional[int] = None) -> Tuple[array, array, int]:
+    """Декодирует не более count команд начиная со смещения pos.
+
+    Возвращает массивы опкодов и операндов и смещение следующей команды.
+    binary_data может быть bytes, memoryview или mmap.
+    """
+    count = -1 if count is None else count
+    if np is None:
+        return _decode_scalar(binary_data, pos, count)
+    return _decode_numpy(binary_data, pos, count)
@@ -0,0 +1,115 @@
+import hashlib
+import marshal
+import os
+import sys
+import types
+from collections import OrderedDict
+from typing import List, Optional
+
+from interpreter import LOAD_CONST, MEMORY_READ, MEMORY_WRITE, MIN_OP, decode_program
+
+# Максимальное число команд в одной сгенерированной функции
+BLOCK_SIZE = 1000
+
+# Кэш скомпилированных программ по хешу содержимого .bin; хранит
+# CACHE_SIZE последних программ, чтобы долгоживущий процесс не рос
+CACHE_SIZE = 8
+_cache: 'OrderedDict[str, CompiledProgram]' = OrderedDict()
+
+
+class CompiledProgram:
+    """Программа УВМ, переведённая в набор Python-функций (по одной на блок)."""
+
+    def __init__(self, codes: List[types.CodeType], max_address: int):
+        self.codes = codes
+        self.max_address = max_address
+        self.blocks = [types.FunctionType(code, {}) for code in codes]
+
+    def run(self, memory, accumulator: int) -> int:
+        """Исполняет все блоки по порядку и возвращает итоговый аккумулятор."""
+        if self.max_address >= len(memory):
+            raise ValueError(f"Invalid memory address: {self.max_address}")
+        for block in self.blocks:
+            accumulator = block(memory, accumulator)
+        return accumulator
+
+
+def generate_block(opcodes, operands) -> str:
+    """Генерирует исходный код функции для одного линейного блока команд."""
+    lines = ['def block(memory, acc):']
+    for opcode, operand in zip(opcodes, operands):
+        if opcode == LOAD_CONST:
+            lines.append(f'    acc = {operand}')
+        elif opcode == MEMORY_READ:
+            lines.append(f'    acc = memory[{operand}]')
+        elif opcode == MEMORY_WRITE:
+            lines.append(f'    memory[{operand}] = acc')
+        elif opcode == MIN_OP:
+            lines.append(f'    value = memory[{operand}]')
+            lines.append('    if value < acc: acc = value')
+    lines.append('    return acc')
+    return '\n'.join(lines) + '\n'
+
+
+def compile_block(opcodes, operands, name: str) -> types.CodeType:
+    """Компилирует блок и возвращает code object его функции."""
+    namespace = {}
+    exec(compile(generate_block(opcodes, operands), name, 'exec'), namespace)
+    return namespace['block'].__code__
+
+
+def compile_program(binary_data, block_size: int = BLOCK_SIZE,
+                    cache_dir: Optional[str] = None) -> CompiledProgram:
+    """Компилирует программу, используя кэш по SHA-256 её содержимого.
+
+    Если задан cache_dir, code objects дополнительно сохраняются на диск
+    через marshal и переиспользуются между запусками. Формат marshal зависит
+    от версии интерпретатора, поэтому она входит в имя файла.
+    """
+    digest = hashlib.sha256(binary_data).hexdigest()
+    key = f'{digest}-{block_size}-{sys.implementation.cache_tag}'
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f'{key}.uvmc')
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                codes, max_address = marshal.load(f)
+            program = CompiledProgram(codes, max_address)
+            _remember(key, program)
+            return program
+
+    opcodes, operands = decode_program(binary_data)
+    max_address = -1
+    for opcode, operand in zip(opcodes, operands):
+        if opcode != LOAD_CONST and operand > max_address:
+            max_address = operand
+
+    codes = []
+    for start in range(0, len(opcodes), block_size):
+        end = start + block_size
+        codes.append(compile_block(opcodes[start:end], operands[start:end],
+                                   f'<uvm block {start}-{min(end, len(opcodes)) - 1}>'))
+
+    program = CompiledProgram(codes, max_address)
+    _remember(key, program)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Каталог кэша может быть общим для нескольких процессов: пишем во
+        # временный файл процесса и атомарно переименовываем
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            marshal.dump((codes, max_address), f)
+        os.replace(temp_path, cache_path)
+
+    return program
+
+
+def _remember(key: str, program: CompiledProgram):
+    _cache[key] = program
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
@@ -1,11 +1,68 @@
+import argparse
+import hashlib
+import mmap
+import os
 import struct
 import yaml
-from typing import List
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from checkpoint import Snapshot, load_snapshot, save_snapshot
+from codec import LOAD_CONST, MEMORY_READ, MEMORY_WRITE, MIN_OP, decode as decode_chunk
+from memory import BACKENDS, create_memory
+from tracer import Tracer
+
+# Число команд, декодируемых за один шаг при потоковом исполнении
+CHUNK_SIZE = 16384
+# Интервал между снимками состояния по умолчанию, в командах
+CHECKPOINT_INTERVAL = 100000
+
+
+def decode_program(binary_data) -> Tuple[array, array]:
+    """Декодирует всю программу за один проход в массивы опкодов и операндов."""
+    opcodes, operands, _ = decode_chunk(binary_data)
+    return opcodes, operands
+
+
+def iter_chunks(binary_data, count: int = CHUNK_SIZE) -> Iterator[Tuple[array, array]]:
+    """Лениво декодирует программу блоками по count команд."""
+    pos = 0
+    while pos < len(binary_data):
+        opcodes, operands, pos = decode_chunk(binary_data, pos, count)
+        yield opcodes, operands
+
+
+@contextmanager
+def open_binary(binary_path: str) -> Iterator[memoryview]:
+    """Отображает бинарный файл в память без копирования.
+
+    Страницы подгружаются ОС по мере обращения к ним, поэтому исполнение
+    начинается сразу, а файл не копируется целиком в память процесса.
+    """
+    with open(binary_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Пустой файл нельзя отобразить через mmap
+            yield memoryview(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
 
 class UVMInterpreter:
-    def __init__(self):
-        self.memory = [0] * 1024  # 1024 memory locations
+    ENGINES = ('reference', 'threaded', 'compiled')
+
+    def __init__(self, tracer: Optional[Tracer] = None, memory_backend: str = 'list',
+                 memory_size: Optional[int] = None):
+        # По умолчанию 1024 ячейки; paged по умолчанию покрывает все 17-битные адреса
+        self.memory = create_memory(memory_backend, memory_size)
         self.accumulator = 0
+        # Трассировка включается передачей Tracer; без неё движки не меняются
+        self.tracer = tracer
 
     def load_constant(self, value: int):
         self.accumulator = value
@@ -40,12 +97,117 @@ class UVMInterpreter:
         else:
             raise ValueError(f"Unknown opcode: {opcode}")
 
-    def execute(self, binary_path: str, start_addr: int, end_addr: int, output_path: str):
-        # Read binary file
-        with open(binary_path, 'rb') as f:
-            binary_data = f.read()
+    def validate_program(self, opcodes: array, operands: array):
+        """Проверяет адреса всех команд работы с памятью один раз, до исполнения."""
+        size = len(self.memory)
+        for opcode, operand in zip(opcodes, operands):
+            if opcode != LOAD_CONST and not 0 <= operand < size:
+                raise ValueError(f"Invalid memory address: {operand}")
+
+    def _make_handlers(self) -> Dict[int, Callable[[int, int], int]]:
+        """Таблица обработчиков: (аккумулятор, операнд) -> новый аккумулятор.
+
+        Адреса уже проверены в validate_program, поэтому обработчики
+        обращаются к памяти без проверок.
+        """
+        memory = self.memory
+
+        def load_constant(acc, operand):
+            return operand
+
+        def memory_read(acc, operand):
+            return memory[operand]
+
+        def memory_write(acc, operand):
+            memory[operand] = acc
+            return acc
+
+        def min_operation(acc, operand):
+            value = memory[operand]
+            return value if value < acc else acc
+
+        return {
+            LOAD_CONST: load_constant,
+            MEMORY_READ: memory_read,
+            MEMORY_WRITE: memory_write,
+            MIN_OP: min_operation,
+        }
+
+    def run_threaded(self, opcodes: array, operands: array):
+        """Исполняет предекодированную программу через таблицу обработчиков."""
+        self.validate_program(opcodes, operands)
+        handlers = self._make_handlers()
+        if self.tracer is not None:
+            self.accumulator = self.tracer.run(handlers, opcodes, operands, self.accumulator)
+            return
+
+        # Шитый код: каждой команде заранее сопоставлен её обработчик
+        code = [handlers[opcode] for opcode in opcodes]
+
+        acc = self.accumulator
+        for handler, operand in zip(code, operands):
+            acc = handler(acc, operand)
+        self.accumulator = acc
+
+    def run_stream(self, chunks: Iterable[Tuple[array, array]]):
+        """Исполняет программу блоками по мере их декодирования.
+
+        Адреса проверяются для каждого блока перед его исполнением, так что
+        ошибка в поздней части программы обнаруживается после исполнения
+        предыдущих блоков.
+        """
+        for opcodes, operands in chunks:
+            self.run_threaded(opcodes, operands)
+
+    def snapshot(self, path: str, pc: int = 0, offset: int = 0, digest: bytes = bytes(32)):
+        """Сохраняет аккумулятор и память вместе с позицией в программе."""
+        save_snapshot(path, Snapshot(pc, offset, self.accumulator, self.memory, digest))
+
+    def restore(self, path: str) -> Snapshot:
+        """Восстанавливает аккумулятор и память из снимка и возвращает его."""
+        snapshot = load_snapshot(path)
+        self.memory = snapshot.memory
+        self.accumulator = snapshot.accumulator
+        return snapshot
+
+    def run_checkpointed(self, binary_data, checkpoint_path: str,
+                         interval: int = CHECKPOINT_INTERVAL):
+        """Исполняет программу, сохраняя снимок каждые interval команд.
 
-        # Execute instructions
+        Если снимок уже существует, исполнение продолжается с него. После
+        успешного завершения снимок удаляется.
+        """
+        if interval <= 0:
+            raise ValueError(f"Checkpoint interval must be positive, got {interval}")
+        digest = hashlib.sha256(binary_data).digest()
+        pc = pos = 0
+        if os.path.exists(checkpoint_path):
+            snapshot = self.restore(checkpoint_path)
+            if snapshot.digest != digest:
+                raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different program")
+            pc, pos = snapshot.pc, snapshot.offset
+
+        next_checkpoint = pc + interval
+        while pos < len(binary_data):
+            opcodes, operands, pos = decode_chunk(binary_data, pos, min(CHUNK_SIZE, next_checkpoint - pc))
+            self.run_threaded(opcodes, operands)
+            pc += len(opcodes)
+            if pc >= next_checkpoint:
+                self.snapshot(checkpoint_path, pc, pos, digest)
+                next_checkpoint = pc + interval
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def run_compiled(self, binary_data: bytes, cache_dir: Optional[str] = None):
+        """Исполняет программу, скомпилированную в Python-функции по блокам."""
+        from compiler import compile_program
+
+        program = compile_program(binary_data, cache_dir=cache_dir)
+        self.accumulator = program.run(self.memory, self.accumulator)
+
+    def run_reference(self, binary_data: bytes):
+        """Эталонный цикл: декодирование и исполнение по одной команде."""
         pos = 0
         while pos < len(binary_data):
             # Получаем опкод из первых 5 бит
@@ -68,12 +230,30 @@ class UVMInterpreter:
             
             self.execute_instruction(opcode, operand)
 
+    def execute(self, binary_path: str, start_addr: int, end_addr: int, output_path: str,
+                engine: str = 'reference', cache_dir: Optional[str] = None,
+                checkpoint_path: Optional[str] = None, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+
+        # Map binary file and execute instructions
+        with open_binary(binary_path) as binary_data:
+            # Снимки и трасса пишутся только декодером шитого кода, независимо от engine
+            if checkpoint_path:
+                self.run_checkpointed(binary_data, checkpoint_path, checkpoint_interval)
+            elif engine == 'threaded' or self.tracer is not None:
+                self.run_stream(iter_chunks(binary_data))
+            elif engine == 'compiled':
+                self.run_compiled(binary_data, cache_dir)
+            else:
+                self.run_reference(binary_data)
+
         # Save memory range to output file
         result = {
             'memory_range': {
                 'start': start_addr,
                 'end': end_addr,
-                'values': self.memory[start_addr:end_addr+1]
+                'values': list(self.memory[start_addr:end_addr+1])
             }
         }
         
@@ -81,18 +261,45 @@ class UVMInterpreter:
             yaml.dump(result, f)
 
 def main():
-    import sys
-    if len(sys.argv) != 5:
-        print("Usage: python interpreter.py <binary_file> <start_addr> <end_addr> <output_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='UVM interpreter')
+    parser.add_argument('binary_file', help='Path to the assembled binary')
+    parser.add_argument('start_addr', type=int, help='First memory address to dump')
+    parser.add_argument('end_addr', type=int, help='Last memory address to dump')
+    parser.add_argument('output_file', help='Path to the YAML result file')
+    parser.add_argument('--engine', choices=UVMInterpreter.ENGINES, default='reference',
+                        help='Execution engine (default: reference)')
+    parser.add_argument('--cache-dir', help='Directory for compiled code cache (compiled engine only)')
+    parser.add_argument('--trace', help='Write a binary execution trace and profile to this file')
+    parser.add_argument('--trace-size', type=int, default=65536,
+                        help='Number of last instructions kept in the trace (default: 65536)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print per-opcode and hot address profile')
+    parser.add_argument('--memory', choices=BACKENDS, default='list',
+                        help='Memory backend (default: list)')
+    parser.add_argument('--memory-size', type=int,
+                        help='Number of memory cells (default: 1024, or 131072 for paged)')
+    parser.add_argument('--checkpoint', help='Snapshot file to resume from and update during the run')
+    parser.add_argument('--checkpoint-interval', type=int, default=CHECKPOINT_INTERVAL,
+                        help=f'Instructions between snapshots (default: {CHECKPOINT_INTERVAL})')
+    args = parser.parse_args()
 
-    interpreter = UVMInterpreter()
+    tracer = Tracer(args.trace_size) if args.trace or args.profile else None
+    interpreter = UVMInterpreter(tracer, memory_backend=args.memory, memory_size=args.memory_size)
     interpreter.execute(
-        sys.argv[1],
-        int(sys.argv[2]),
-        int(sys.argv[3]),
-        sys.argv[4]
+        args.binary_file,
+        args.start_addr,
+        args.end_addr,
+        args.output_file,
+        engine=args.engine,
+        cache_dir=args.cache_dir,
+        checkpoint_path=args.checkpoint,
+        checkpoint_interval=args.checkpoint_interval
     )
 
+    if args.trace:
+        tracer.save(args.trace)
+    if args.profile:
+        print(tracer.summary(), end='')
+
 if __name__ == '__main__':
     main()
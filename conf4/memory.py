@@ -0,0 +1,69 @@
+from array import array
+from typing import Dict, Optional
+
+from codec import ADDRESS_MASK
+
+# Полное адресное пространство УВМ: 17-битные адреса
+ADDRESS_SPACE = ADDRESS_MASK + 1
+DEFAULT_SIZE = 1024
+BACKENDS = ('list', 'dense', 'paged')
+
+
+class PagedMemory:
+    """Разреженная память: страницы выделяются при первой записи в них.
+
+    Чтение из невыделенной страницы возвращает 0, поэтому программа,
+    обращающаяся к разбросанным адресам, не выделяет всё пространство.
+    """
+
+    def __init__(self, size: int = ADDRESS_SPACE, page_bits: int = 10):
+        self.size = size
+        self.page_bits = page_bits
+        self.page_mask = (1 << page_bits) - 1
+        self.pages: Dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, address):
+        if type(address) is slice:
+            return [self[i] for i in range(*address.indices(self.size))]
+        page = self.pages.get(address >> self.page_bits)
+        if page is None:
+            return 0
+        return page[address & self.page_mask]
+
+    def __setitem__(self, address: int, value: int):
+        page = self.pages.get(address >> self.page_bits)
+        if page is None:
+            page = array('q', bytes(8 << self.page_bits))
+            self.pages[address >> self.page_bits] = page
+        page[address & self.page_mask] = value
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def __eq__(self, other) -> bool:
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+
+def create_memory(backend: str = 'list', size: Optional[int] = None):
+    """Создаёт память УВМ выбранного вида.
+
+    list  - список Python (поведение по умолчанию);
+    dense - плотный array('q'), подходит для небольших пространств;
+    paged - PagedMemory, по умолчанию на все 17-битные адреса.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown memory backend: {backend}")
+    if size is None:
+        size = ADDRESS_SPACE if backend == 'paged' else DEFAULT_SIZE
+    if not 0 < size <= ADDRESS_SPACE:
+        raise ValueError(f"Memory size must be 1-{ADDRESS_SPACE}, got {size}")
+
+    if backend == 'dense':
+        return array('q', bytes(8 * size))
+    if backend == 'paged':
+        return PagedMemory(size)
+    return [0] * size
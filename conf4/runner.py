@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+import time
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+from interpreter import UVMInterpreter
+
+REQUIRED_KEYS = ('binary', 'start', 'end', 'output')
+
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """Читает YAML-манифест со списком заданий.
+
+    Формат: {'jobs': [{'binary': ..., 'start': ..., 'end': ..., 'output': ...}]}.
+    Относительные пути считаются от каталога манифеста.
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = yaml.safe_load(f) or {}
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for index, job in enumerate(manifest.get('jobs') or []):
+        missing = [key for key in REQUIRED_KEYS if key not in job]
+        if missing:
+            raise ValueError(f"Job {index} is missing keys: {', '.join(missing)}")
+        jobs.append({
+            'binary': os.path.join(base_dir, job['binary']),
+            'start': int(job['start']),
+            'end': int(job['end']),
+            'output': os.path.join(base_dir, job['output']),
+        })
+    return jobs
+
+
+def run_job(job: Dict, engine: str = 'reference') -> Dict:
+    """Исполняет одно задание; ошибка возвращается в результате, а не бросается."""
+    started = time.perf_counter()
+    result = {'binary': job['binary'], 'output': job['output']}
+    try:
+        UVMInterpreter().execute(job['binary'], job['start'], job['end'], job['output'], engine=engine)
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def run_jobs(jobs: List[Dict], workers: Optional[int] = None, engine: str = 'reference') -> List[Dict]:
+    """Исполняет задания в пуле из workers процессов.
+
+    Процессы пула переиспользуются для всех заданий, поэтому импорт Python и
+    PyYAML оплачивается один раз на процесс. Результаты идут в порядке заданий.
+    """
+    if not jobs:
+        return []
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    if workers == 1:
+        return [run_job(job, engine) for job in jobs]
+
+    # Задания отдаются пачками, чтобы не гонять каждое через IPC по отдельности
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(run_job, engine=engine), jobs, chunksize=chunksize))
+
+
+def summarize(results: List[Dict]) -> Dict:
+    failed = [result for result in results if result['status'] != 'ok']
+    return {
+        'total': len(results),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many UVM programs in parallel')
+    parser.add_argument('manifest', help='YAML manifest with a list of jobs')
+    parser.add_argument('--workers', type=int, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--engine', choices=UVMInterpreter.ENGINES, default='reference',
+                        help='Execution engine (default: reference)')
+    parser.add_argument('--report', help='Write the aggregated results to this YAML file')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = summarize(run_jobs(load_manifest(args.manifest), args.workers, args.engine))
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            yaml.dump(summary, f, sort_keys=False)
+    for result in summary['results']:
+        if result['status'] != 'ok':
+            print(f"{result['binary']}: {result['error']}", file=sys.stderr)
+    print(f"{summary['succeeded']}/{summary['total']} jobs succeeded "
+          f"in {time.perf_counter() - started:.2f}s")
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
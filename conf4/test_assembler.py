@@ -1,7 +1,19 @@
 import os
 import unittest
 import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+import random
+import yaml
 from assembler import Assembler, Instruction
+from interpreter import UVMInterpreter, decode_program
+
+def write_source(text):
+    """Helper function to write an .asm source to a temporary file"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.asm', delete=False) as f:
+        f.write(text)
+    return f.name
 
 class TestAssembler(unittest.TestCase):
     def test_instruction_encoding(self):
@@ -71,5 +83,118 @@ class TestAssembler(unittest.TestCase):
             instr = Instruction(99, 0)  # Invalid opcode
             instr.encode()
 
+class TestStreamingAssembler(unittest.TestCase):
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def temp_path(self):
+        path = tempfile.NamedTemporaryFile(delete=False).name
+        self.paths.append(path)
+        return path
+
+    def assemble_both(self, source):
+        self.paths.append(source)
+        binary, log = self.temp_path(), self.temp_path()
+        stream_binary, stream_log = self.temp_path(), self.temp_path()
+        with redirect_stdout(StringIO()):
+            Assembler().assemble(source, binary, log)
+        count = Assembler().assemble_stream(source, stream_binary, stream_log)
+
+        with open(binary, 'rb') as a, open(stream_binary, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        with open(log) as a, open(stream_log) as b:
+            self.assertEqual(a.read(), b.read())
+        return count
+
+    def test_matches_assemble(self):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_program.asm')) as f:
+            source = write_source(f.read())
+        self.assertEqual(self.assemble_both(source), 56)
+
+    def test_empty_source(self):
+        self.assertEqual(self.assemble_both(write_source("; only a comment\n\n")), 0)
+
+    def test_constant_memory(self):
+        def peak_for(lines):
+            source = write_source("LOAD 129\nWRITE 761\nREAD 10\nMIN 935\n" * lines)
+            self.paths.append(source)
+            tracemalloc.start()
+            try:
+                Assembler().assemble_stream(source, self.temp_path(), self.temp_path())
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, large = peak_for(100), peak_for(5000)
+        self.assertLess(large, small * 2)
+
+class TestPeephole(unittest.TestCase):
+    def optimize(self, source):
+        assembler = Assembler(optimize=True)
+        kept = list(assembler.peephole(assembler.parse_source(source.splitlines())))
+        return [f'{assembler.names[op]} {arg}' for _, op, arg in kept], assembler.removed
+
+    def test_dead_loads(self):
+        kept, removed = self.optimize("LOAD 1\nLOAD 2\nREAD 5\nWRITE 6")
+        self.assertEqual(kept, ['READ 5', 'WRITE 6'])
+        self.assertEqual([entry['line'] for entry in removed], [1, 2])
+        self.assertEqual(removed[0]['reason'], 'dead accumulator load')
+
+    def test_redundant_memory_access(self):
+        kept, removed = self.optimize("LOAD 7\nWRITE 3\nREAD 3\nWRITE 3\nMIN 4\nMIN 4\nREAD 4\nMIN 4")
+        self.assertEqual(kept, ['LOAD 7', 'WRITE 3', 'MIN 4', 'READ 4'])
+        self.assertEqual([entry['instruction'] for entry in removed],
+                         ['READ 3', 'WRITE 3', 'MIN 4', 'MIN 4'])
+
+    def test_write_after_dead_load(self):
+        # LOAD между записью и чтением мёртв, после его удаления чтение тоже лишнее
+        kept, _ = self.optimize("LOAD 1\nWRITE 2\nLOAD 9\nREAD 2\nWRITE 5")
+        self.assertEqual(kept, ['LOAD 1', 'WRITE 2', 'WRITE 5'])
+
+    def test_memory_state_preserved(self):
+        rng = random.Random(4)
+        mnemonics = ['LOAD', 'READ', 'WRITE', 'MIN']
+        for _ in range(30):
+            source = "\n".join(f"{rng.choice(mnemonics)} {rng.randrange(4)}" for _ in range(200))
+            results = []
+            for optimize in (False, True):
+                assembler = Assembler(optimize=optimize)
+                parsed = assembler.parse_source(source.splitlines())
+                if optimize:
+                    parsed = assembler.peephole(parsed)
+                binary = b''.join(Instruction(op, arg).encode() for _, op, arg in parsed)
+                interpreter = UVMInterpreter()
+                interpreter.run_threaded(*decode_program(binary))
+                results.append((interpreter.memory, len(binary)))
+            self.assertEqual(results[0][0], results[1][0])
+            self.assertLessEqual(results[1][1], results[0][1])
+
+    def test_log_records_removed(self):
+        source = write_source("LOAD 1\nLOAD 2\nWRITE 0\nREAD 0\n")
+        binary, log, stream_binary, stream_log = [tempfile.NamedTemporaryFile(delete=False).name
+                                                  for _ in range(4)]
+        try:
+            with redirect_stdout(StringIO()):
+                Assembler(optimize=True).assemble(source, binary, log)
+            Assembler(optimize=True).assemble_stream(source, stream_binary, stream_log)
+            with open(log) as f:
+                text = f.read()
+            self.assertEqual(yaml.safe_load(text)['removed'], [
+                {'line': 1, 'instruction': 'LOAD 1', 'reason': 'dead accumulator load'},
+                {'line': 4, 'instruction': 'READ 0', 'reason': 'read after write of the same address'},
+            ])
+            with open(stream_log) as f:
+                self.assertEqual(f.read(), text)
+            with open(binary, 'rb') as a, open(stream_binary, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+        finally:
+            for path in (source, binary, log, stream_binary, stream_log):
+                os.unlink(path)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+import os
+import unittest
+import tempfile
+import yaml
+import numpy as np
+from assembler import Instruction
+from batch import BatchUVMInterpreter
+from benchmark import generate_program
+from interpreter import UVMInterpreter, decode_program
+
+class TestBatchInterpreter(unittest.TestCase):
+    def test_matches_single_runs(self):
+        binary = generate_program(2000, seed=13)
+        rng = np.random.default_rng(0)
+        memories = rng.integers(0, 1000, size=(16, 1024))
+
+        batch = BatchUVMInterpreter(memories)
+        batch.run(*decode_program(binary))
+
+        for i in range(len(memories)):
+            single = UVMInterpreter()
+            single.memory = memories[i].tolist()
+            single.run_reference(binary)
+            self.assertEqual(batch.memories[i].tolist(), single.memory)
+            self.assertEqual(int(batch.accumulator[i]), single.accumulator)
+
+    def test_min_per_instance(self):
+        binary = Instruction(14, 50).encode() + Instruction(20, 3).encode() + \
+            Instruction(15, 4).encode()
+        batch = BatchUVMInterpreter.zeros(3, 8)
+        batch.memories[:, 3] = [10, 50, 90]
+        batch.run(*decode_program(binary))
+        self.assertEqual(batch.memories[:, 4].tolist(), [10, 50, 50])
+
+    def test_invalid_address(self):
+        batch = BatchUVMInterpreter.zeros(2)
+        with self.assertRaises(ValueError):
+            batch.run(*decode_program(Instruction(25, 4096).encode()))
+
+    def test_execute(self):
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(Instruction(25, 0).encode() + Instruction(15, 1).encode())
+        result_file = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            batch = BatchUVMInterpreter(np.array([[1, 0], [2, 0], [3, 0]]))
+            batch.execute(f.name, 0, 1, result_file)
+            with open(result_file) as r:
+                result = yaml.safe_load(r)
+            self.assertEqual([run['memory_range']['values'] for run in result['runs']],
+                             [[1, 1], [2, 2], [3, 3]])
+        finally:
+            os.unlink(f.name)
+            os.unlink(result_file)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import json
+import unittest
+from benchmark import SUITE_MIXES, compare, generate_instructions, run_suite
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_generate_instructions_mix(self):
+        opcodes, operands = generate_instructions(500, seed=1, weights=SUITE_MIXES['load_store'])
+        self.assertEqual(set(opcodes), {14, 15})
+        self.assertEqual(generate_instructions(500, seed=1, weights=SUITE_MIXES['load_store']),
+                         (opcodes, operands))
+
+    def test_run_suite(self):
+        results = run_suite(sizes=(50,), repeat=1)
+        results = json.loads(json.dumps(results))
+        self.assertEqual(len(results['results']), len(SUITE_MIXES))
+        case = results['results'][0]
+        for key in ('assemble_s', 'assemble_stream_s', 'log_yaml_s', 'decode_s', 'compile_s',
+                    'peak_memory_bytes', 'output_yaml_s', 'bytes'):
+            self.assertIn(key, case)
+        self.assertEqual(set(case['instructions_per_s']), {'reference', 'threaded', 'compiled'})
+
+        rows = compare(results, results)
+        self.assertTrue(rows)
+        self.assertTrue(all(ratio == 1.0 for _, _, _, ratio in rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import unittest
+import tempfile
+from benchmark import generate_program
+from interpreter import UVMInterpreter
+
+class InterruptedInterpreter(UVMInterpreter):
+    """Interpreter that fails after a given number of executed chunks"""
+    def __init__(self, chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks_left = chunks
+
+    def run_threaded(self, opcodes, operands):
+        if self.chunks_left == 0:
+            raise KeyboardInterrupt
+        self.chunks_left -= 1
+        super().run_threaded(opcodes, operands)
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.binary = os.path.join(self.directory, 'program.bin')
+        self.checkpoint = os.path.join(self.directory, 'program.snap')
+        with open(self.binary, 'wb') as f:
+            f.write(generate_program(2000, seed=29))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def result(self, name):
+        with open(os.path.join(self.directory, name)) as f:
+            return f.read()
+
+    def test_snapshot_restore(self):
+        for backend in ('list', 'dense', 'paged'):
+            interpreter = UVMInterpreter(memory_backend=backend)
+            interpreter.memory[7] = 123
+            interpreter.accumulator = 45
+            interpreter.snapshot(self.checkpoint, pc=10, offset=38)
+
+            restored = UVMInterpreter()
+            snapshot = restored.restore(self.checkpoint)
+            self.assertEqual((snapshot.pc, snapshot.offset), (10, 38))
+            self.assertEqual(restored.accumulator, 45)
+            self.assertEqual(restored.memory[7], 123)
+            self.assertEqual(type(restored.memory), type(interpreter.memory))
+            self.assertEqual(len(restored.memory), len(interpreter.memory))
+
+    def test_resume_matches_uninterrupted(self):
+        output = os.path.join(self.directory, 'full.yaml')
+        UVMInterpreter().execute(self.binary, 0, 1023, output)
+
+        resumed_output = os.path.join(self.directory, 'resumed.yaml')
+        with self.assertRaises(KeyboardInterrupt):
+            InterruptedInterpreter(5).execute(self.binary, 0, 1023, resumed_output,
+                                              checkpoint_path=self.checkpoint,
+                                              checkpoint_interval=300)
+        self.assertTrue(os.path.exists(self.checkpoint))
+        self.assertEqual(UVMInterpreter().restore(self.checkpoint).pc, 1500)
+
+        UVMInterpreter().execute(self.binary, 0, 1023, resumed_output,
+                                 checkpoint_path=self.checkpoint, checkpoint_interval=300)
+        self.assertEqual(self.result('resumed.yaml'), self.result('full.yaml'))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_checkpoint_of_other_program(self):
+        UVMInterpreter().snapshot(self.checkpoint)
+        with self.assertRaises(ValueError):
+            UVMInterpreter().execute(self.binary, 0, 1, os.path.join(self.directory, 'out.yaml'),
+                                     checkpoint_path=self.checkpoint)
+
+if __name__ == '__main__':
+    unittest.main()
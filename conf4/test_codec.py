@@ -0,0 +1,77 @@
+import random
+import unittest
+import codec
+from assembler import Instruction
+
+OPCODES = [Instruction.LOAD_CONST, Instruction.MEMORY_READ,
+           Instruction.MEMORY_WRITE, Instruction.MIN_OP]
+
+def random_instructions(rng, count):
+    """Helper function to build random (opcode, operand) lists covering edge values"""
+    opcodes, operands = [], []
+    for _ in range(count):
+        opcode = rng.choice(OPCODES)
+        limit = 0x1FFFFFFF if opcode == Instruction.LOAD_CONST else 0x1FFFF
+        operand = rng.choice([0, 1, limit, rng.randrange(limit + 1)])
+        opcodes.append(opcode)
+        operands.append(operand)
+    return opcodes, operands
+
+class TestCodec(unittest.TestCase):
+    def test_encode_matches_scalar(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            opcodes, operands = random_instructions(rng, rng.randrange(1, 200))
+            expected = b''.join(Instruction(op, arg).encode() for op, arg in zip(opcodes, operands))
+            self.assertEqual(codec.encode(opcodes, operands), expected)
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            opcodes, operands = random_instructions(rng, rng.randrange(1, 200))
+            binary = b''.join(Instruction(op, arg).encode() for op, arg in zip(opcodes, operands))
+            decoded_opcodes, decoded_operands, pos = codec.decode(binary)
+            self.assertEqual(list(decoded_opcodes), opcodes)
+            self.assertEqual(list(decoded_operands), operands)
+            self.assertEqual(pos, len(binary))
+
+    def test_decode_matches_scalar_path(self):
+        opcodes, operands = random_instructions(random.Random(2), 1000)
+        binary = codec.encode(opcodes, operands)
+        self.assertEqual(codec.decode(binary), codec._decode_scalar(binary, 0, -1))
+        _, _, pos = codec.decode(binary, 0, 3)
+        self.assertEqual(codec.decode(memoryview(binary), pos, 100),
+                         codec._decode_scalar(binary, pos, 100))
+
+    def test_decode_count(self):
+        binary = codec.encode([14, 25, 15, 20], [129, 10, 761, 935])
+        opcodes, operands, pos = codec.decode(binary, 0, 2)
+        self.assertEqual(list(opcodes), [14, 25])
+        self.assertEqual(pos, 8)
+        opcodes, operands, pos = codec.decode(binary, pos)
+        self.assertEqual(list(operands), [761, 935])
+        self.assertEqual(pos, len(binary))
+
+    def test_empty(self):
+        self.assertEqual(codec.encode([], []), b'')
+        opcodes, operands, pos = codec.decode(b'')
+        self.assertEqual((len(opcodes), len(operands), pos), (0, 0, 0))
+
+    def test_encode_errors(self):
+        with self.assertRaises(ValueError):
+            codec.encode([99], [0])
+        with self.assertRaises(ValueError):
+            codec.encode([25], [0x20000])
+        with self.assertRaises(ValueError):
+            codec.encode([14], [-1])
+        with self.assertRaises(ValueError):
+            codec.encode([14, 25], [1])
+
+    def test_decode_errors(self):
+        with self.assertRaises(ValueError):
+            codec.decode(bytes([0x1F, 0x00, 0x00]))
+        with self.assertRaises(ValueError):
+            codec.decode(Instruction(14, 129).encode()[:3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import unittest
+import tempfile
+import yaml
+from assembler import Instruction
+from benchmark import generate_program
+from compiler import CACHE_SIZE, compile_program, generate_block, _cache
+from interpreter import UVMInterpreter
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self):
+        _cache.clear()
+
+    def test_generate_block(self):
+        source = generate_block([14, 15, 25, 20], [42, 0, 1, 2])
+        self.assertIn('acc = 42', source)
+        self.assertIn('memory[0] = acc', source)
+        self.assertIn('acc = memory[1]', source)
+        self.assertIn('value = memory[2]', source)
+
+    def test_matches_reference(self):
+        binary = generate_program(5000, seed=7)
+        reference = UVMInterpreter()
+        reference.run_reference(binary)
+        compiled = UVMInterpreter()
+        compiled.run_compiled(binary)
+        self.assertEqual(compiled.memory, reference.memory)
+        self.assertEqual(compiled.accumulator, reference.accumulator)
+
+    def test_small_blocks(self):
+        binary = generate_program(100, seed=3)
+        program = compile_program(binary, block_size=7)
+        self.assertEqual(len(program.blocks), 15)
+
+        reference = UVMInterpreter()
+        reference.run_reference(binary)
+        memory = [0] * 1024
+        self.assertEqual(program.run(memory, 0), reference.accumulator)
+        self.assertEqual(memory, reference.memory)
+
+    def test_cache_by_content(self):
+        binary = generate_program(50, seed=5)
+        self.assertIs(compile_program(binary), compile_program(bytes(binary)))
+        self.assertIsNot(compile_program(binary), compile_program(generate_program(50, seed=6)))
+
+    def test_cache_is_bounded(self):
+        first = generate_program(20, seed=0)
+        program = compile_program(first)
+        for seed in range(1, CACHE_SIZE + 1):
+            compile_program(generate_program(20, seed=seed))
+        self.assertEqual(len(_cache), CACHE_SIZE)
+        self.assertIsNot(compile_program(first), program)
+
+    def test_disk_cache(self):
+        binary = generate_program(200, seed=9)
+        cache_dir = tempfile.mkdtemp()
+        try:
+            first = compile_program(binary, cache_dir=cache_dir)
+            names = os.listdir(cache_dir)
+            self.assertEqual(len(names), 1)
+            self.assertIn(sys.implementation.cache_tag, names[0])
+
+            _cache.clear()
+            second = compile_program(binary, cache_dir=cache_dir)
+            self.assertIsNot(first, second)
+            memory_first, memory_second = [0] * 1024, [0] * 1024
+            self.assertEqual(first.run(memory_first, 0), second.run(memory_second, 0))
+            self.assertEqual(memory_first, memory_second)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_invalid_address(self):
+        binary = Instruction(14, 1).encode() + Instruction(15, 5000).encode()
+        interpreter = UVMInterpreter()
+        with self.assertRaises(ValueError):
+            interpreter.run_compiled(binary)
+
+    def test_execute_engine(self):
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(generate_program(500, seed=11))
+        reference_file = tempfile.NamedTemporaryFile(delete=False).name
+        compiled_file = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            UVMInterpreter().execute(f.name, 0, 1023, reference_file)
+            UVMInterpreter().execute(f.name, 0, 1023, compiled_file, engine='compiled')
+            with open(reference_file) as a, open(compiled_file) as b:
+                self.assertEqual(yaml.safe_load(a), yaml.safe_load(b))
+        finally:
+            os.unlink(f.name)
+            os.unlink(reference_file)
+            os.unlink(compiled_file)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 import os
 import unittest
 import tempfile
+import tracemalloc
 import yaml
-from interpreter import UVMInterpreter
+from interpreter import UVMInterpreter, decode_program, iter_chunks, open_binary
+from assembler import Instruction
+from benchmark import generate_program
 
 def create_test_binary(instructions):
     """Helper function to create a binary file with test instructions"""
@@ -97,5 +100,104 @@ class TestInterpreter(unittest.TestCase):
         with self.assertRaises(ValueError):
             interpreter.execute_instruction(99, 0)
 
+class TestThreadedEngine(unittest.TestCase):
+    def test_decode_program(self):
+        binary = Instruction(14, 129).encode() + Instruction(25, 10).encode() + \
+            Instruction(15, 761).encode() + Instruction(20, 935).encode()
+        opcodes, operands = decode_program(binary)
+        self.assertEqual(list(opcodes), [14, 25, 15, 20])
+        self.assertEqual(list(operands), [129, 10, 761, 935])
+
+    def test_decode_truncated(self):
+        with self.assertRaises(ValueError):
+            decode_program(Instruction(14, 129).encode()[:4])
+
+    def test_decode_unknown_opcode(self):
+        with self.assertRaises(ValueError):
+            decode_program(bytes([0x1F, 0x00, 0x00]))
+
+    def test_matches_reference(self):
+        binary = generate_program(5000, seed=42)
+        reference = UVMInterpreter()
+        reference.run_reference(binary)
+        threaded = UVMInterpreter()
+        threaded.run_threaded(*decode_program(binary))
+        self.assertEqual(threaded.memory, reference.memory)
+        self.assertEqual(threaded.accumulator, reference.accumulator)
+
+    def test_invalid_address_rejected_before_execution(self):
+        binary = Instruction(14, 7).encode() + Instruction(15, 0).encode() + \
+            Instruction(15, 2000).encode()
+        interpreter = UVMInterpreter()
+        with self.assertRaises(ValueError):
+            interpreter.run_threaded(*decode_program(binary))
+        self.assertEqual(interpreter.memory[0], 0)
+
+    def test_execute_engine(self):
+        binary_file = create_test_binary([generate_program(500, seed=1)])
+        reference_file = tempfile.NamedTemporaryFile(delete=False).name
+        threaded_file = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            UVMInterpreter().execute(binary_file, 0, 1023, reference_file)
+            UVMInterpreter().execute(binary_file, 0, 1023, threaded_file, engine='threaded')
+            with open(reference_file) as f, open(threaded_file) as g:
+                self.assertEqual(yaml.safe_load(f), yaml.safe_load(g))
+        finally:
+            os.unlink(binary_file)
+            os.unlink(reference_file)
+            os.unlink(threaded_file)
+
+    def test_execute_unknown_opcode(self):
+        # Ошибка декодера не должна подменяться ошибкой закрытия mmap
+        binary_file = create_test_binary([Instruction(14, 7).encode(), bytes([0x1F, 0x00, 0x00])])
+        result_file = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            for engine in UVMInterpreter.ENGINES:
+                with self.subTest(engine=engine):
+                    with self.assertRaisesRegex(ValueError, 'Unknown opcode: 31'):
+                        UVMInterpreter().execute(binary_file, 0, 1, result_file, engine=engine)
+        finally:
+            os.unlink(binary_file)
+            os.unlink(result_file)
+
+class TestMappedLoading(unittest.TestCase):
+    def test_iter_chunks_matches_decode(self):
+        binary = generate_program(1000, seed=21)
+        opcodes, operands = decode_program(binary)
+        chunks = list(iter_chunks(memoryview(binary), count=64))
+        self.assertEqual(len(chunks), 16)
+        self.assertEqual([op for chunk in chunks for op in chunk[0]], list(opcodes))
+        self.assertEqual([arg for chunk in chunks for arg in chunk[1]], list(operands))
+
+    def test_open_empty_binary(self):
+        binary_file = create_test_binary([])
+        try:
+            with open_binary(binary_file) as data:
+                self.assertEqual(len(data), 0)
+        finally:
+            os.unlink(binary_file)
+
+    def test_large_binary_peak_memory(self):
+        # ~6 MB программа из двух миллионов команд чтения/записи
+        body = b''.join(Instruction(25, i).encode() + Instruction(15, 255 - i).encode()
+                        for i in range(256))
+        binary_file = create_test_binary([Instruction(14, 1).encode(), Instruction(15, 0).encode()] +
+                                         [body] * 4000)
+        result_file = tempfile.NamedTemporaryFile(delete=False).name
+        size = os.path.getsize(binary_file)
+        try:
+            interpreter = UVMInterpreter()
+            tracemalloc.start()
+            try:
+                interpreter.execute(binary_file, 0, 1023, result_file, engine='threaded')
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, size // 4)
+            self.assertEqual(interpreter.memory[255], 1)
+        finally:
+            os.unlink(binary_file)
+            os.unlink(result_file)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import os
+import unittest
+import tempfile
+import yaml
+from assembler import Instruction
+from benchmark import generate_program
+from interpreter import UVMInterpreter, decode_program
+from memory import ADDRESS_SPACE, PagedMemory, create_memory
+
+class TestMemoryBackends(unittest.TestCase):
+    def test_paged_memory(self):
+        memory = PagedMemory()
+        self.assertEqual(len(memory), ADDRESS_SPACE)
+        self.assertEqual(memory[100000], 0)
+        self.assertEqual(memory.pages, {})
+
+        memory[100000] = 5
+        memory[5] = 7
+        self.assertEqual(memory[100000], 5)
+        self.assertEqual(memory[5], 7)
+        self.assertEqual(memory[4:7], [0, 7, 0])
+        self.assertEqual(len(memory.pages), 2)
+
+    def test_create_memory(self):
+        self.assertEqual(create_memory(), [0] * 1024)
+        self.assertEqual(len(create_memory('dense', 16)), 16)
+        self.assertEqual(len(create_memory('paged')), ADDRESS_SPACE)
+        with self.assertRaises(ValueError):
+            create_memory('sparse')
+        with self.assertRaises(ValueError):
+            create_memory('dense', ADDRESS_SPACE + 1)
+
+    def test_backends_match_reference(self):
+        binary = generate_program(3000, seed=23)
+        reference = UVMInterpreter()
+        reference.run_reference(binary)
+        for backend in ('dense', 'paged'):
+            interpreter = UVMInterpreter(memory_backend=backend, memory_size=1024)
+            interpreter.run_threaded(*decode_program(binary))
+            self.assertEqual(list(interpreter.memory), reference.memory)
+            self.assertEqual(interpreter.accumulator, reference.accumulator)
+
+            compiled = UVMInterpreter(memory_backend=backend, memory_size=1024)
+            compiled.run_compiled(binary)
+            self.assertEqual(list(compiled.memory), reference.memory)
+
+    def test_scattered_addresses(self):
+        binary = b''.join(Instruction(14, i).encode() + Instruction(15, i * 4099).encode()
+                          for i in range(1, 32))
+        interpreter = UVMInterpreter(memory_backend='paged')
+        interpreter.run_threaded(*decode_program(binary))
+        self.assertEqual(interpreter.memory[31 * 4099], 31)
+        self.assertEqual(len(interpreter.memory.pages), 31)
+
+        # Список на 1024 ячейки такие адреса отвергает
+        with self.assertRaises(ValueError):
+            UVMInterpreter().run_threaded(*decode_program(binary))
+
+    def test_yaml_dump(self):
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(Instruction(14, 9).encode() + Instruction(15, 131071).encode())
+        result_file = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            for engine in UVMInterpreter.ENGINES:
+                UVMInterpreter(memory_backend='paged').execute(f.name, 131070, 131071, result_file,
+                                                               engine=engine)
+                with open(result_file) as r:
+                    self.assertEqual(yaml.safe_load(r)['memory_range']['values'], [0, 9])
+        finally:
+            os.unlink(f.name)
+            os.unlink(result_file)
+
+if __name__ == '__main__':
+    unittest.main()
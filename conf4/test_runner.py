@@ -0,0 +1,56 @@
+import os
+import shutil
+import unittest
+import tempfile
+import yaml
+from benchmark import generate_program
+from interpreter import UVMInterpreter
+from runner import load_manifest, run_jobs, summarize
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.manifest = os.path.join(self.directory, 'jobs.yaml')
+        jobs = []
+        for i in range(6):
+            with open(os.path.join(self.directory, f'p{i}.bin'), 'wb') as f:
+                f.write(generate_program(300, seed=i))
+            jobs.append({'binary': f'p{i}.bin', 'start': 0, 'end': 31, 'output': f'r{i}.yaml'})
+        # Задание с несуществующим файлом должно попасть в ошибки, не ломая остальные
+        jobs.append({'binary': 'missing.bin', 'start': 0, 'end': 1, 'output': 'missing.yaml'})
+        with open(self.manifest, 'w') as f:
+            yaml.dump({'jobs': jobs}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_manifest(self):
+        jobs = load_manifest(self.manifest)
+        self.assertEqual(len(jobs), 7)
+        self.assertEqual(jobs[0]['binary'], os.path.join(self.directory, 'p0.bin'))
+        self.assertEqual(jobs[0]['end'], 31)
+
+    def test_load_manifest_missing_keys(self):
+        with open(self.manifest, 'w') as f:
+            yaml.dump({'jobs': [{'binary': 'p0.bin'}]}, f)
+        with self.assertRaises(ValueError):
+            load_manifest(self.manifest)
+
+    def test_run_jobs(self):
+        for workers in (1, 2):
+            summary = summarize(run_jobs(load_manifest(self.manifest), workers=workers))
+            self.assertEqual((summary['succeeded'], summary['failed']), (6, 1))
+            self.assertEqual(summary['results'][-1]['status'], 'error')
+            self.assertIn('FileNotFoundError', summary['results'][-1]['error'])
+
+            for i in range(6):
+                expected = os.path.join(self.directory, 'expected.yaml')
+                UVMInterpreter().execute(os.path.join(self.directory, f'p{i}.bin'), 0, 31, expected)
+                with open(expected) as a, open(os.path.join(self.directory, f'r{i}.yaml')) as b:
+                    self.assertEqual(a.read(), b.read())
+
+    def test_no_jobs(self):
+        self.assertEqual(run_jobs([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+import tempfile
+from assembler import Instruction
+from benchmark import generate_program
+from interpreter import UVMInterpreter, decode_program
+from tracer import Tracer
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.binary = b''.join([
+            Instruction(14, 42).encode(),
+            Instruction(15, 0).encode(),
+            Instruction(14, 17).encode(),
+            Instruction(20, 0).encode(),
+            Instruction(15, 1).encode(),
+        ])
+
+    def test_records(self):
+        interpreter = UVMInterpreter(Tracer())
+        interpreter.run_threaded(*decode_program(self.binary))
+        self.assertEqual(interpreter.tracer.records(), [
+            (0, 14, 42, 42),
+            (1, 15, 0, 42),
+            (2, 14, 17, 17),
+            (3, 20, 0, 17),
+            (4, 15, 1, 17),
+        ])
+        self.assertEqual(interpreter.memory[:2], [42, 17])
+
+    def test_ring_buffer_keeps_last(self):
+        interpreter = UVMInterpreter(Tracer(3))
+        interpreter.run_threaded(*decode_program(self.binary))
+        self.assertEqual([record[0] for record in interpreter.tracer.records()], [2, 3, 4])
+        self.assertEqual(interpreter.tracer.total, 5)
+
+    def test_profile(self):
+        tracer = Tracer()
+        UVMInterpreter(tracer).run_threaded(*decode_program(self.binary))
+        self.assertEqual(tracer.opcode_counts[14], 2)
+        self.assertEqual(tracer.opcode_counts[15], 2)
+        self.assertEqual(tracer.hot_addresses(), [(0, 2), (1, 1)])
+        self.assertIn('MIN (20): 1', tracer.summary())
+
+    def test_traced_matches_untraced(self):
+        binary = generate_program(3000, seed=17)
+        traced = UVMInterpreter(Tracer(100))
+        traced.run_threaded(*decode_program(binary))
+        plain = UVMInterpreter()
+        plain.run_threaded(*decode_program(binary))
+        self.assertEqual(traced.memory, plain.memory)
+        self.assertEqual(traced.accumulator, plain.accumulator)
+
+    def test_save_load(self):
+        tracer = Tracer(4)
+        UVMInterpreter(tracer).run_threaded(*decode_program(generate_program(500, seed=19)))
+        path = tempfile.NamedTemporaryFile(delete=False).name
+        try:
+            tracer.save(path)
+            loaded = Tracer.load(path)
+        finally:
+            os.unlink(path)
+        self.assertEqual(loaded.records(), tracer.records())
+        self.assertEqual(loaded.total, 500)
+        self.assertEqual(list(loaded.opcode_counts), list(tracer.opcode_counts))
+        self.assertEqual(loaded.hot_addresses(50), tracer.hot_addresses(50))
+
+    def test_load_rejects_other_files(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'not a trace at all')
+        try:
+            with self.assertRaises(ValueError):
+                Tracer.load(f.name)
+        finally:
+            os.unlink(f.name)
+
+if __name__ == '__main__':
+    unittest.main()
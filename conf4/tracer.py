@@ -0,0 +1,131 @@
+import struct
+from array import array
+from typing import Callable, Dict, List, Tuple
+
+from codec import ADDRESS_MASK, LOAD_CONST, MEMORY_READ, MEMORY_WRITE, MIN_OP
+
+MNEMONICS = {
+    LOAD_CONST: 'LOAD',
+    MEMORY_READ: 'READ',
+    MEMORY_WRITE: 'WRITE',
+    MIN_OP: 'MIN',
+}
+
+# Заголовок файла трассы: сигнатура, версия, число записей, всего команд
+TRACE_MAGIC = b'UVMT'
+TRACE_VERSION = 1
+HEADER = struct.Struct('<4sHIQ')
+COUNT = struct.Struct('<I')
+
+
+class Tracer:
+    """Кольцевой буфер последних исполненных команд и профиль горячих точек.
+
+    Буфер хранит четыре заранее выделенных массива (pc, опкод, операнд,
+    аккумулятор после команды), поэтому запись не выделяет память.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        if capacity <= 0:
+            raise ValueError(f"Trace capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.pcs = array('q', bytes(8 * capacity))
+        self.opcodes = array('B', bytes(capacity))
+        self.operands = array('q', bytes(8 * capacity))
+        self.accumulators = array('q', bytes(8 * capacity))
+        self.total = 0
+        self.opcode_counts = array('q', bytes(8 * 32))
+        self.address_counts = array('q', bytes(8 * (ADDRESS_MASK + 1)))
+
+    def run(self, handlers: Dict[int, Callable[[int, int], int]], opcodes, operands, acc: int) -> int:
+        """Исполняет команды через handlers, записывая каждую в трассу."""
+        pcs, trace_opcodes = self.pcs, self.opcodes
+        trace_operands, accumulators = self.operands, self.accumulators
+        opcode_counts, address_counts = self.opcode_counts, self.address_counts
+        capacity = self.capacity
+        pc = self.total
+
+        for opcode, operand in zip(opcodes, operands):
+            acc = handlers[opcode](acc, operand)
+            i = pc % capacity
+            pcs[i] = pc
+            trace_opcodes[i] = opcode
+            trace_operands[i] = operand
+            accumulators[i] = acc
+            opcode_counts[opcode] += 1
+            if opcode != LOAD_CONST:
+                address_counts[operand] += 1
+            pc += 1
+
+        self.total = pc
+        return acc
+
+    def records(self) -> List[Tuple[int, int, int, int]]:
+        """Записи буфера от старой к новой: (pc, опкод, операнд, аккумулятор)."""
+        count = min(self.total, self.capacity)
+        start = self.total - count
+        result = []
+        for pc in range(start, self.total):
+            i = pc % self.capacity
+            result.append((self.pcs[i], self.opcodes[i], self.operands[i], self.accumulators[i]))
+        return result
+
+    def hot_addresses(self, top: int = 10) -> List[Tuple[int, int]]:
+        """Самые часто используемые адреса: список (адрес, число обращений)."""
+        used = [(address, count) for address, count in enumerate(self.address_counts) if count]
+        used.sort(key=lambda item: (-item[1], item[0]))
+        return used[:top]
+
+    def summary(self, top: int = 10) -> str:
+        lines = [f"Executed {self.total} instructions", "Opcodes:"]
+        for opcode, name in MNEMONICS.items():
+            lines.append(f"  {name} ({opcode}): {self.opcode_counts[opcode]}")
+        lines.append("Hot addresses:")
+        for address, count in self.hot_addresses(top):
+            lines.append(f"  {address}: {count}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path: str):
+        """Сохраняет трассу и профиль в компактный бинарный файл."""
+        records = self.records()
+        addresses = array('q', (address for address, count in enumerate(self.address_counts) if count))
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(records), self.total))
+            for column, typecode in enumerate('qBqq'):
+                array(typecode, (record[column] for record in records)).tofile(f)
+            self.opcode_counts.tofile(f)
+            f.write(COUNT.pack(len(addresses)))
+            addresses.tofile(f)
+            array('q', (self.address_counts[address] for address in addresses)).tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> 'Tracer':
+        """Читает файл, записанный save(); буфер получает ровно сохранённые записи."""
+        with open(path, 'rb') as f:
+            magic, version, count, total = HEADER.unpack(f.read(HEADER.size))
+            if magic != TRACE_MAGIC or version != TRACE_VERSION:
+                raise ValueError(f"Not a UVM trace file: {path}")
+
+            tracer = cls(max(count, 1))
+            columns = []
+            for typecode in 'qBqq':
+                column = array(typecode)
+                column.fromfile(f, count)
+                columns.append(column)
+            tracer.opcode_counts = array('q')
+            tracer.opcode_counts.fromfile(f, 32)
+            (used,) = COUNT.unpack(f.read(COUNT.size))
+            addresses, counts = array('q'), array('q')
+            addresses.fromfile(f, used)
+            counts.fromfile(f, used)
+
+        # Записи кладём так, чтобы records() вернул их в исходном порядке
+        for pc, opcode, operand, acc in zip(*columns):
+            i = pc % tracer.capacity
+            tracer.pcs[i], tracer.opcodes[i] = pc, opcode
+            tracer.operands[i], tracer.accumulators[i] = operand, acc
+        tracer.total = total
+        for address, address_count in zip(addresses, counts):
+            tracer.address_counts[address] = address_count
+        return tracer
@@ -0,0 +1,294 @@
+import hashlib
+import heapq
+import os
+import struct
+import sys
+from array import array
+
+# Заголовок файла: сигнатура, версия, число коммитов, число рёбер к родителям,
+# объём фильтров Блума и длина таблицы авторов в байтах
+GRAPH_MAGIC = b'KGCG'
+GRAPH_VERSION = 1
+HEADER = struct.Struct('<4sHxxIIII')
+
+# Фильтр Блума: бит на изменённый путь и число хэш-функций, как в git
+BLOOM_BITS_PER_PATH = 10
+BLOOM_HASHES = 7
+# Коммит, изменивший больше путей, получает пустой фильтр, который совпадает со всем
+MAX_CHANGED_PATHS = 512
+
+GRAPH_FILE = 'visualizer-commit-graph'
+
+
+def _bloom_positions(path, size_bits):
+    digest = hashlib.blake2b(path.encode('utf-8', errors='surrogateescape'), digest_size=8).digest()
+    h1, h2 = struct.unpack('<II', digest)
+    return [(h1 + i * h2) % size_bits for i in range(BLOOM_HASHES)]
+
+
+def bloom_filter(paths):
+    """Фильтр Блума для набора путей; b'' значит «изменено может быть что угодно»."""
+    if paths is None:
+        return b''
+    size_bits = max(64, len(paths) * BLOOM_BITS_PER_PATH)
+    size_bits += -size_bits % 8
+    bits = bytearray(size_bits // 8)
+    for path in paths:
+        for position in _bloom_positions(path, size_bits):
+            bits[position >> 3] |= 1 << (position & 7)
+    return bytes(bits)
+
+
+def bloom_contains(bits, path):
+    if not bits:
+        return True
+    size_bits = len(bits) * 8
+    return all(bits[position >> 3] & (1 << (position & 7)) for position in _bloom_positions(path, size_bits))
+
+
+def _timezone_minutes(timezone):
+    sign = -1 if timezone.startswith('-') else 1
+    return sign * (int(timezone[1:3]) * 60 + int(timezone[3:5]))
+
+
+def _timezone_text(minutes):
+    sign = '-' if minutes < 0 else '+'
+    minutes = abs(minutes)
+    return f'{sign}{minutes // 60:02d}{minutes % 60:02d}'
+
+
+def _le(values):
+    """Массив в порядке байт little-endian для записи в файл."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode, data):
+    values = array(typecode, data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class CommitGraph:
+    """Индекс графа коммитов в файле: SHA коммитов и деревьев, индексы
+    родителей, автор и время, фильтр Блума изменённых относительно первого
+    родителя путей.
+
+    История файла по индексу не читает объекты коммитов: обход идёт по
+    массивам, деревья читаются только для коммитов, чей фильтр не исключил путь.
+    """
+
+    def __init__(self):
+        self.shas = []
+        self.trees = []
+        self.parents = []
+        self.commit_times = array('q')
+        self.timestamps = array('q')
+        self.timezones = array('h')
+        self.author_ids = array('I')
+        self.authors = []
+        self.blooms = []
+        self.positions = {}
+        self._author_ids = {}
+
+    def __len__(self):
+        return len(self.shas)
+
+    @classmethod
+    def load(cls, path):
+        graph = cls()
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Not a commit-graph file: {path}")
+        magic, version, count, edges, bloom_bytes, authors_bytes = HEADER.unpack_from(data)
+        if magic != GRAPH_MAGIC or version != GRAPH_VERSION:
+            raise ValueError(f"Not a commit-graph file: {path}")
+
+        pos = HEADER.size
+
+        def take(size):
+            nonlocal pos
+            chunk = data[pos:pos + size]
+            if len(chunk) != size:
+                raise ValueError(f"Truncated commit-graph file: {path}")
+            pos += size
+            return chunk
+
+        shas = take(count * 20)
+        trees = take(count * 20)
+        graph.shas = [shas[i * 20:i * 20 + 20].hex() for i in range(count)]
+        graph.trees = [trees[i * 20:i * 20 + 20].hex() for i in range(count)]
+        graph.commit_times = _from_le('q', take(count * 8))
+        graph.timestamps = _from_le('q', take(count * 8))
+        graph.timezones = _from_le('h', take(count * 2))
+        graph.author_ids = _from_le('I', take(count * 4))
+        parent_counts = _from_le('H', take(count * 2))
+        parent_ids = _from_le('I', take(edges * 4))
+        bloom_offsets = _from_le('I', take((count + 1) * 4))
+        blooms = take(bloom_bytes)
+        graph.authors = take(authors_bytes).decode('utf-8').split('\n') if count else []
+
+        start = 0
+        for i in range(count):
+            graph.parents.append(tuple(parent_ids[start:start + parent_counts[i]]))
+            start += parent_counts[i]
+            graph.blooms.append(blooms[bloom_offsets[i]:bloom_offsets[i + 1]])
+        graph.positions = {sha: i for i, sha in enumerate(graph.shas)}
+        graph._author_ids = {author: i for i, author in enumerate(graph.authors)}
+        return graph
+
+    def save(self, path):
+        """Атомарно записывает индекс: сначала во временный файл, затем rename."""
+        parent_counts = array('H', (len(parents) for parents in self.parents))
+        parent_ids = array('I', (parent for parents in self.parents for parent in parents))
+        bloom_offsets = array('I', [0])
+        for bits in self.blooms:
+            bloom_offsets.append(bloom_offsets[-1] + len(bits))
+        authors = '\n'.join(self.authors).encode('utf-8')
+
+        header = HEADER.pack(GRAPH_MAGIC, GRAPH_VERSION, len(self), len(parent_ids),
+                             bloom_offsets[-1], len(authors))
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(b''.join(bytes.fromhex(sha) for sha in self.shas))
+            f.write(b''.join(bytes.fromhex(tree) for tree in self.trees))
+            for values in (self.commit_times, self.timestamps, self.timezones, self.author_ids,
+                           parent_counts, parent_ids, bloom_offsets):
+                f.write(_le(values))
+            f.write(b''.join(self.blooms))
+            f.write(authors)
+        os.replace(temp_path, path)
+
+    def update(self, walker, starts):
+        """Добавляет коммиты, достижимые из starts и ещё не попавшие в индекс.
+
+        Предки проиндексированного коммита уже в индексе, поэтому обход
+        останавливается на нём. Возвращает число добавленных коммитов.
+        """
+        new = []
+        stack = list(starts)
+        seen = set()
+        while stack:
+            sha = walker.commit(stack.pop()).sha
+            if sha in self.positions or sha in seen:
+                continue
+            seen.add(sha)
+            new.append(sha)
+            stack.extend(walker.commit(sha).parents)
+
+        for sha in new:
+            self.positions[sha] = len(self.shas)
+            self.shas.append(sha)
+        for sha in new:
+            commit = walker.commit(sha)
+            self.trees.append(commit.tree)
+            self.parents.append(tuple(self.positions[parent] for parent in commit.parents))
+            self.commit_times.append(commit.commit_time)
+            self.timestamps.append(commit.timestamp)
+            self.timezones.append(_timezone_minutes(commit.timezone))
+            if commit.author not in self._author_ids:
+                self._author_ids[commit.author] = len(self.authors)
+                self.authors.append(commit.author)
+            self.author_ids.append(self._author_ids[commit.author])
+            first_parent = walker.commit(commit.parents[0]).tree if commit.parents else None
+            self.blooms.append(bloom_filter(changed_paths(walker, first_parent, commit.tree)))
+        return len(new)
+
+    def walk(self, starts):
+        """Индексы коммитов, достижимых из starts, от новых к старым, как HistoryWalker.walk."""
+        queue = []
+        seen = set()
+        order = 0
+        for sha in starts:
+            i = self.positions[sha]
+            if i not in seen:
+                seen.add(i)
+                heapq.heappush(queue, (-self.commit_times[i], order, i))
+                order += 1
+        while queue:
+            _, _, i = heapq.heappop(queue)
+            yield i
+            for parent in self.parents[i]:
+                if parent not in seen:
+                    seen.add(parent)
+                    heapq.heappush(queue, (-self.commit_times[parent], order, parent))
+                    order += 1
+
+    def file_history(self, walker, starts, path):
+        """Индексы коммитов, изменивших path; те же правила, что у HistoryWalker."""
+        history = []
+        path_shas = {}
+
+        def path_at(i):
+            if i not in path_shas:
+                path_shas[i] = walker.path_sha(self.trees[i], path)
+            return path_shas[i]
+
+        for i in self.walk(starts):
+            parents = self.parents[i]
+            # Фильтр строится по первому родителю: если он исключает путь,
+            # файл совпадает с первым родителем и коммит его не менял
+            if parents and not bloom_contains(self.blooms[i], path):
+                continue
+            current = path_at(i)
+            if parents:
+                changed = all(current != path_at(parent) for parent in parents)
+            else:
+                changed = current is not None
+            if changed:
+                history.append(i)
+        return history
+
+    def info(self, i):
+        """(SHA, автор, время, часовой пояс) коммита по индексу."""
+        return (self.shas[i], self.authors[self.author_ids[i]], self.timestamps[i],
+                _timezone_text(self.timezones[i]))
+
+
+def changed_paths(walker, old_tree, new_tree):
+    """Пути файлов и каталогов, отличающиеся в двух деревьях, или None,
+    если их больше MAX_CHANGED_PATHS. Одинаковые поддеревья не читаются."""
+    paths = set()
+
+    def add(path):
+        paths.add(path)
+        if len(paths) > MAX_CHANGED_PATHS:
+            raise OverflowError
+
+    def diff(old_sha, new_sha, prefix):
+        old = walker.tree(old_sha) if old_sha else {}
+        new = walker.tree(new_sha) if new_sha else {}
+        for name in old.keys() | new.keys():
+            old_entry, new_entry = old.get(name), new.get(name)
+            if old_entry == new_entry:
+                continue
+            path = prefix + name
+            add(path)
+            old_sub = old_entry[1] if old_entry and old_entry[0] == '40000' else None
+            new_sub = new_entry[1] if new_entry and new_entry[0] == '40000' else None
+            if old_sub or new_sub:
+                diff(old_sub, new_sub, path + '/')
+
+    try:
+        diff(old_tree, new_tree, '')
+    except OverflowError:
+        return None
+    return paths
+
+
+def graph_path(repository_path):
+    """Путь индекса по умолчанию: внутри .git, рядом с объектами репозитория."""
+    return os.path.join(repository_path, '.git', GRAPH_FILE)
+
+
+def load_or_create(path):
+    """Индекс из файла или пустой, если файла нет или он не читается."""
+    try:
+        return CommitGraph.load(path)
+    except (OSError, ValueError):
+        return CommitGraph()
@@ -0,0 +1,311 @@
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left
+from collections import OrderedDict
+
+# Типы объектов в заголовке записи pack-файла
+OBJECT_TYPES = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+IDX_MAGIC = b'\377tOc'
+PACK_MAGIC = b'PACK'
+
+# Объём разжатых объектов в кэше хранилища, в байтах
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def apply_delta(base, delta):
+    """Восстанавливает объект из базы и дельты формата git (copy/insert)."""
+    pos = 0
+
+    def varint():
+        nonlocal pos
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value
+
+    base_size = varint()
+    result_size = varint()
+    if base_size != len(base):
+        raise ValueError(f"Delta base size {base_size} does not match {len(base)}")
+
+    result = bytearray()
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            # Копирование куска базы: смещение и размер заданы байтами по маске
+            offset = size = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if opcode & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            result += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            result += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError("Invalid delta opcode 0")
+
+    if len(result) != result_size:
+        raise ValueError(f"Delta result size {len(result)} does not match {result_size}")
+    return bytes(result)
+
+
+class ObjectCache:
+    """LRU-кэш разжатых объектов, ограниченный суммарным размером данных.
+
+    Считает попадания, промахи и вытеснения для отчёта.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        size = len(value[1])
+        if size > self.max_bytes:
+            return
+        if key in self.items:
+            self.size -= len(self.items.pop(key)[1])
+        self.items[key] = value
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= len(evicted[1])
+            self.evictions += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'objects': len(self.items), 'bytes': self.size}
+
+
+class PackIndex:
+    """Индекс .idx версии 2: fan-out, отсортированные SHA и смещения.
+
+    Файл отображается в память, поиск SHA - fan-out и бинарный поиск
+    в диапазоне объектов с тем же первым байтом.
+    """
+
+    def __init__(self, idx_path):
+        self.path = idx_path
+        with open(idx_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != IDX_MAGIC or struct.unpack('>I', self._map[4:8])[0] != 2:
+            self._map.close()
+            raise ValueError(f"Unsupported pack index (only v2): {idx_path}")
+        self.fanout = struct.unpack('>256I', self._map[8:8 + 256 * 4])
+        self.count = self.fanout[255]
+        self._shas = 8 + 256 * 4
+        self._offsets = self._shas + self.count * 20 + self.count * 4
+        self._large_offsets = self._offsets + self.count * 4
+
+    def sha(self, i):
+        start = self._shas + i * 20
+        return self._map[start:start + 20]
+
+    def offset(self, i):
+        (offset,) = struct.unpack_from('>I', self._map, self._offsets + i * 4)
+        if offset & 0x80000000:
+            # Смещения больше 2 ГиБ лежат в отдельной таблице 64-битных чисел
+            (offset,) = struct.unpack_from('>Q', self._map, self._large_offsets + (offset & 0x7fffffff) * 8)
+        return offset
+
+    def find(self, sha):
+        """Смещение объекта в .pack по 20-байтному SHA или None."""
+        low = self.fanout[sha[0] - 1] if sha[0] else 0
+        high = self.fanout[sha[0]]
+        i = bisect_left(_ShaColumn(self), sha, low, high)
+        if i < high and self.sha(i) == sha:
+            return self.offset(i)
+        return None
+
+    def shas(self):
+        for i in range(self.count):
+            yield self.sha(i).hex()
+
+    def close(self):
+        self._map.close()
+
+
+class _ShaColumn:
+    """Столбец SHA индекса как последовательность для bisect без копирования."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.count
+
+    def __getitem__(self, i):
+        return self.index.sha(i)
+
+
+class PackFile:
+    """Pack-файл в памяти; объекты разжимаются прямо из mmap по смещению."""
+
+    def __init__(self, pack_path, store):
+        self.path = pack_path
+        self.store = store
+        self.index = PackIndex(pack_path[:-len('.pack')] + '.idx')
+        with open(pack_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Not a pack file: {pack_path}")
+
+    def _inflate(self, pos, size):
+        # Длина сжатых данных в pack не записана: кормим zlib кусками до конца потока
+        decompressor = zlib.decompressobj()
+        parts = []
+        chunk = size + 64
+        while not decompressor.eof:
+            data = self._map[pos:pos + chunk]
+            if not data:
+                raise ValueError(f"Truncated object data at {pos} in {self.path}")
+            parts.append(decompressor.decompress(data))
+            pos += len(data)
+            chunk = 64 * 1024
+        return b''.join(parts)
+
+    def read_at(self, offset):
+        """(тип, данные) объекта по смещению с раскрытием цепочки дельт.
+
+        Объекты pack-файла кэшируются по позиции: так и объект, найденный по
+        SHA, и база дельты другого объекта разжимаются один раз.
+        """
+        key = (self.path, offset)
+        obj = self.store.cache.get(key)
+        if obj is None:
+            obj = self._read_at(offset)
+            self.store.cache.put(key, obj)
+        return obj
+
+    def _read_at(self, offset):
+        pos = offset
+        byte = self._map[pos]
+        pos += 1
+        kind = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = self._map[pos]
+            pos += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+
+        if kind == OFS_DELTA:
+            byte = self._map[pos]
+            pos += 1
+            base_offset = byte & 0x7f
+            while byte & 0x80:
+                byte = self._map[pos]
+                pos += 1
+                base_offset = ((base_offset + 1) << 7) | (byte & 0x7f)
+            base_type, base = self.read_at(offset - base_offset)
+            return base_type, apply_delta(base, self._inflate(pos, size))
+        if kind == REF_DELTA:
+            base_sha = self._map[pos:pos + 20].hex()
+            base_type, base = self.store.read(base_sha)
+            return base_type, apply_delta(base, self._inflate(pos + 20, size))
+        if kind not in OBJECT_TYPES:
+            raise ValueError(f"Unknown pack object type {kind} at {offset} in {self.path}")
+        return OBJECT_TYPES[kind], self._inflate(pos, size)
+
+    def close(self):
+        self.index.close()
+        self._map.close()
+
+
+class ObjectStore:
+    """Хранилище объектов репозитория: loose-объекты и pack-файлы.
+
+    Разжатые объекты общие для всех чтений через cache: loose-объекты
+    лежат в нём по SHA, объекты pack-файлов - по (pack, смещение).
+    """
+
+    def __init__(self, git_dir, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.git_dir = git_dir
+        self.objects_dir = os.path.join(git_dir, 'objects')
+        self.cache = ObjectCache(cache_bytes)
+        self.packs = []
+        pack_dir = os.path.join(self.objects_dir, 'pack')
+        if os.path.isdir(pack_dir):
+            for name in sorted(os.listdir(pack_dir)):
+                if name.endswith('.pack') and os.path.exists(os.path.join(pack_dir, name[:-5] + '.idx')):
+                    self.packs.append(PackFile(os.path.join(pack_dir, name), self))
+
+    def _loose_path(self, sha):
+        return os.path.join(self.objects_dir, sha[:2], sha[2:])
+
+    def read(self, sha):
+        """(тип, данные) объекта по hex SHA; KeyError, если объекта нет."""
+        key = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.index.find(key)
+            if offset is not None:
+                return pack.read_at(offset)
+
+        obj = self.cache.get(sha)
+        if obj is not None:
+            return obj
+        path = self._loose_path(sha)
+        if not os.path.exists(path):
+            raise KeyError(sha)
+        with open(path, 'rb') as f:
+            header, _, body = zlib.decompress(f.read()).partition(b'\x00')
+        obj = (header.split(b' ')[0].decode('ascii'), body)
+        self.cache.put(sha, obj)
+        return obj
+
+    def __contains__(self, sha):
+        if os.path.exists(self._loose_path(sha)):
+            return True
+        key = bytes.fromhex(sha)
+        return any(pack.index.find(key) is not None for pack in self.packs)
+
+    def shas(self):
+        """Все SHA хранилища: сначала loose, затем из индексов pack-файлов."""
+        seen = set()
+        for directory in sorted(os.listdir(self.objects_dir)):
+            if len(directory) != 2:
+                continue
+            for name in sorted(os.listdir(os.path.join(self.objects_dir, directory))):
+                sha = directory + name
+                seen.add(sha)
+                yield sha
+        for pack in self.packs:
+            for sha in pack.index.shas():
+                if sha not in seen:
+                    seen.add(sha)
+                    yield sha
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+        self.packs = []
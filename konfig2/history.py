@@ -0,0 +1,195 @@
+import heapq
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+HEX_SHA = re.compile(r'[0-9a-f]{40}')
+
+
+class Commit(NamedTuple):
+    sha: str
+    tree: str
+    parents: List[str]
+    author: str
+    timestamp: int
+    timezone: str
+    message: str
+    commit_time: int = 0
+
+
+def parse_commit(sha, data):
+    """Разбирает тело объекта commit: дерево, родители, автор и сообщение."""
+    text = data.decode('utf-8', errors='ignore')
+    headers, _, message = text.partition('\n\n')
+    tree = ''
+    parents = []
+    author, timestamp, timezone = '', 0, '+0000'
+    commit_time = 0
+    for line in headers.split('\n'):
+        key, _, value = line.partition(' ')
+        if key == 'tree':
+            tree = value
+        elif key == 'parent':
+            parents.append(value)
+        elif key == 'author':
+            # "Имя <почта> время пояс"
+            name, _, rest = value.rpartition('>')
+            author = name.split('<')[0].strip()
+            fields = rest.split()
+            if len(fields) == 2:
+                timestamp, timezone = int(fields[0]), fields[1]
+        elif key == 'committer':
+            fields = value.rpartition('>')[2].split()
+            if len(fields) == 2:
+                commit_time = int(fields[0])
+    return Commit(sha, tree, parents, author, timestamp, timezone, message, commit_time)
+
+
+def parse_tree(data):
+    """Записи дерева: имя -> (режим, SHA)."""
+    entries = {}
+    pos = 0
+    while pos < len(data):
+        space = data.index(b' ', pos)
+        null = data.index(b'\x00', space)
+        mode = data[pos:space].decode('ascii')
+        name = data[space + 1:null].decode('utf-8', errors='surrogateescape')
+        entries[name] = (mode, data[null + 1:null + 21].hex())
+        pos = null + 21
+    return entries
+
+
+def read_ref(git_dir, name) -> Optional[str]:
+    """SHA ссылки: файл в .git, packed-refs или сам SHA; None, если не найдена."""
+    if HEX_SHA.fullmatch(name):
+        return name
+    packed_refs = read_packed_refs(git_dir)
+    for candidate in (name, f'refs/{name}', f'refs/tags/{name}', f'refs/heads/{name}', f'refs/remotes/{name}'):
+        path = os.path.join(git_dir, candidate)
+        if os.path.isfile(path):
+            with open(path, 'r') as f:
+                value = f.read().strip()
+            if value.startswith('ref: '):
+                return read_ref(git_dir, value[5:])
+            return value
+        packed = packed_refs.get(candidate)
+        if packed:
+            return packed
+    return None
+
+
+def read_packed_refs(git_dir):
+    refs = {}
+    path = os.path.join(git_dir, 'packed-refs')
+    if os.path.isfile(path):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.startswith(('#', '^')):
+                    continue
+                sha, _, name = line.strip().partition(' ')
+                refs[name] = sha
+    return refs
+
+
+class HistoryWalker:
+    """История файла по графу коммитов.
+
+    Обход идёт от стартовых ссылок по строкам parent, новые коммиты первыми.
+    Коммит попадает в историю, если SHA файла в нём отличается от SHA у
+    каждого из родителей. Читаются только коммиты и деревья вдоль пути файла.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Разобранные коммиты: каждый коммит разбирается один раз за обход
+        self.commits = {}
+        self.commit_hits = 0
+        self.commit_misses = 0
+
+    def commit(self, sha) -> Commit:
+        commit = self.commits.get(sha)
+        if commit is not None:
+            self.commit_hits += 1
+            return commit
+        self.commit_misses += 1
+        commit = self.commits[sha] = self._parse(sha)
+        return commit
+
+    def _parse(self, sha) -> Commit:
+        kind, data = self.store.read(sha)
+        # Аннотированный тег указывает на коммит строкой object
+        while kind == 'tag':
+            sha = data.split(b'\n', 1)[0].split(b' ')[1].decode('ascii')
+            kind, data = self.store.read(sha)
+        if kind != 'commit':
+            raise ValueError(f"Object {sha} is a {kind}, not a commit")
+        return parse_commit(sha, data)
+
+    def tree(self, sha):
+        return parse_tree(self.store.read(sha)[1])
+
+    def path_sha(self, tree_sha, path) -> Optional[str]:
+        """SHA объекта по пути внутри дерева или None."""
+        parts = path.strip('/').split('/')
+        sha = tree_sha
+        for depth, part in enumerate(parts):
+            entry = self.tree(sha).get(part)
+            if entry is None:
+                return None
+            mode, sha = entry
+            # Промежуточный компонент пути должен быть каталогом
+            if depth < len(parts) - 1 and mode != '40000':
+                return None
+        return sha
+
+    def walk(self, starts):
+        """Коммиты, достижимые из starts, от новых к старым по времени коммита.
+
+        При равном времени раньше выходит коммит, добавленный в очередь раньше,
+        как в git log.
+        """
+        queue = []
+        seen = set()
+        order = 0
+        for sha in starts:
+            commit = self.commit(sha)
+            if commit.sha not in seen:
+                seen.add(commit.sha)
+                heapq.heappush(queue, (-commit.commit_time, order, commit))
+                order += 1
+        while queue:
+            _, _, commit = heapq.heappop(queue)
+            yield commit
+            for parent in commit.parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    parent_commit = self.commit(parent)
+                    heapq.heappush(queue, (-parent_commit.commit_time, order, parent_commit))
+                    order += 1
+
+    def stats(self):
+        """Счётчики кэша объектов и таблицы разобранных коммитов."""
+        stats = {'objects': self.store.cache.stats()}
+        stats['commits'] = {'hits': self.commit_hits, 'misses': self.commit_misses,
+                            'parsed': len(self.commits)}
+        return stats
+
+    def file_history(self, starts, path) -> List[Commit]:
+        history = []
+        path_shas = {}
+
+        def path_at(commit):
+            if commit.sha not in path_shas:
+                path_shas[commit.sha] = self.path_sha(commit.tree, path)
+            return path_shas[commit.sha]
+
+        for commit in self.walk(starts):
+            current = path_at(commit)
+            parents = [path_at(self.commit(parent)) for parent in commit.parents]
+            if parents:
+                changed = all(current != parent for parent in parents)
+            else:
+                changed = current is not None
+            if changed:
+                history.append(commit)
+        return history
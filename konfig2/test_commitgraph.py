@@ -0,0 +1,83 @@
+import unittest
+import os
+import shutil
+import tempfile
+from commitgraph import CommitGraph, bloom_contains, bloom_filter, graph_path, load_or_create
+from gitdb import ObjectStore
+from history import HistoryWalker, read_ref
+from test_gitdb import git, make_repository
+from visualizer import get_commits_with_file
+
+class TestCommitGraph(unittest.TestCase):
+    def setUp(self):
+        self.repository_path = tempfile.mkdtemp()
+        make_repository(self.repository_path, 6)
+        self.git_dir = os.path.join(self.repository_path, '.git')
+        self.graph_path = graph_path(self.repository_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.repository_path)
+
+    def commit_file(self, name, content, message):
+        with open(os.path.join(self.repository_path, name), 'w') as f:
+            f.write(content)
+        git(self.repository_path, 'add', '.')
+        git(self.repository_path, 'commit', '-q', '-m', message)
+
+    def histories(self, paths):
+        store = ObjectStore(self.git_dir)
+        try:
+            walker = HistoryWalker(store)
+            head = read_ref(self.git_dir, 'HEAD')
+            graph = load_or_create(self.graph_path)
+            graph.update(walker, [head])
+            graph.save(self.graph_path)
+            graph = CommitGraph.load(self.graph_path)
+            for path in paths:
+                expected = [commit.sha for commit in walker.file_history([head], path)]
+                self.assertEqual([graph.info(i)[0] for i in graph.file_history(walker, [head], path)], expected)
+            return graph
+        finally:
+            store.close()
+
+    def test_matches_history_walker(self):
+        git(self.repository_path, 'checkout', '-q', '-b', 'side', 'HEAD~3')
+        self.commit_file('note1.txt', 'side\n', 'Side change')
+        git(self.repository_path, 'checkout', '-q', '-')
+        git(self.repository_path, 'merge', '-q', '--no-edit', 'side')
+        graph = self.histories(['data.txt', 'note1.txt', 'note5.txt', 'missing.txt'])
+        self.assertEqual(len(graph), 8)
+        self.assertEqual(graph.info(0)[1], 'Tester')
+
+    def test_incremental_update(self):
+        self.histories(['data.txt'])
+        self.commit_file('later.txt', 'later\n', 'Later')
+        store = ObjectStore(self.git_dir)
+        try:
+            walker = HistoryWalker(store)
+            graph = CommitGraph.load(self.graph_path)
+            self.assertEqual(graph.update(walker, [read_ref(self.git_dir, 'HEAD')]), 1)
+            self.assertEqual(len(graph), 7)
+            # Проиндексированные коммиты не перечитываются
+            self.assertEqual(walker.stats()['commits']['parsed'], 2)
+        finally:
+            store.close()
+
+    def test_visualizer_uses_graph(self):
+        expected = get_commits_with_file(self.repository_path, 'note2.txt')
+        self.assertEqual(get_commits_with_file(self.repository_path, 'note2.txt',
+                                               commit_graph=self.graph_path), expected)
+        self.assertTrue(os.path.exists(self.graph_path))
+        self.assertEqual(get_commits_with_file(self.repository_path, 'note2.txt',
+                                               commit_graph=self.graph_path), expected)
+
+    def test_bloom_filter(self):
+        paths = {f'dir/file{i}.txt' for i in range(50)}
+        bits = bloom_filter(paths)
+        self.assertTrue(all(bloom_contains(bits, path) for path in paths))
+        misses = sum(not bloom_contains(bits, f'other{i}.txt') for i in range(1000))
+        self.assertGreater(misses, 950)
+        self.assertTrue(bloom_contains(bloom_filter(None), 'anything'))
+
+if __name__ == '__main__':
+    unittest.main()
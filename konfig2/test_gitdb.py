@@ -0,0 +1,78 @@
+import unittest
+import os
+import subprocess
+import shutil
+import tempfile
+from gitdb import ObjectStore, apply_delta
+from visualizer import get_commits_with_file
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='Tester', GIT_AUTHOR_EMAIL='tester@example.com',
+               GIT_COMMITTER_NAME='Tester', GIT_COMMITTER_EMAIL='tester@example.com')
+
+
+def git(repository_path, *args):
+    return subprocess.run(['git', *args], cwd=repository_path, env=GIT_ENV,
+                          capture_output=True, check=True).stdout
+
+
+def make_repository(path, commits):
+    """Репозиторий, где файл растёт от коммита к коммиту: pack получит дельты."""
+    git(path, 'init', '-q')
+    for i in range(commits):
+        with open(os.path.join(path, 'data.txt'), 'w') as f:
+            f.write(''.join(f'line {n}\n' for n in range((i + 1) * 40)))
+        with open(os.path.join(path, f'note{i}.txt'), 'w') as f:
+            f.write(f'note {i}\n')
+        git(path, 'add', '.')
+        git(path, 'commit', '-q', '-m', f'Commit {i}')
+
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.repository_path = tempfile.mkdtemp()
+        make_repository(self.repository_path, 12)
+
+    def tearDown(self):
+        shutil.rmtree(self.repository_path)
+
+    def assert_matches_git(self):
+        store = ObjectStore(os.path.join(self.repository_path, '.git'))
+        try:
+            shas = list(store.shas())
+            self.assertEqual(len(shas), 12 * 4)
+            for sha in shas:
+                kind, data = store.read(sha)
+                self.assertEqual(data, git(self.repository_path, 'cat-file', kind, sha))
+            with self.assertRaises(KeyError):
+                store.read('0' * 40)
+        finally:
+            store.close()
+
+    def test_loose_objects(self):
+        self.assert_matches_git()
+
+    def test_ofs_delta_pack(self):
+        git(self.repository_path, 'repack', '-adfq')
+        self.assert_matches_git()
+
+    def test_ref_delta_pack(self):
+        git(self.repository_path, '-c', 'repack.useDeltaBaseOffset=false', 'repack', '-adfq')
+        self.assert_matches_git()
+
+    def test_visualizer_reads_packs(self):
+        git(self.repository_path, 'repack', '-adq')
+        head = git(self.repository_path, 'rev-parse', 'HEAD').decode().strip()
+        commits = get_commits_with_file(self.repository_path, 'data.txt')
+        self.assertEqual(commits[0][0], head)
+        self.assertEqual(commits[0][1], 'Tester')
+
+    def test_apply_delta(self):
+        base = b'hello world'
+        # Размеры 11 и 8, копирование 5 байт с 6-го, вставка "abc"
+        delta = bytes([11, 8, 0x80 | 0x01 | 0x10, 6, 5, 3]) + b'abc'
+        self.assertEqual(apply_delta(base, delta), b'worldabc')
+        with self.assertRaises(ValueError):
+            apply_delta(b'short', delta)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+import tempfile
+from gitdb import ObjectCache, ObjectStore
+from history import HistoryWalker, read_ref
+from test_gitdb import git, make_repository
+from visualizer import get_commits_with_file
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.repository_path = tempfile.mkdtemp()
+        make_repository(self.repository_path, 5)
+        self.git_dir = os.path.join(self.repository_path, '.git')
+
+    def tearDown(self):
+        shutil.rmtree(self.repository_path)
+
+    def log(self, *args):
+        return git(self.repository_path, 'log', '--format=%H', *args).decode().split()
+
+    def test_matches_git_log(self):
+        os.makedirs(os.path.join(self.repository_path, 'sub'))
+        with open(os.path.join(self.repository_path, 'sub', 'deep.txt'), 'w') as f:
+            f.write('deep\n')
+        git(self.repository_path, 'add', '.')
+        git(self.repository_path, 'commit', '-q', '-m', 'Add sub')
+        git(self.repository_path, 'repack', '-adq')
+
+        store = ObjectStore(self.git_dir)
+        try:
+            walker = HistoryWalker(store)
+            head = read_ref(self.git_dir, 'HEAD')
+            for path in ('data.txt', 'note0.txt', 'note3.txt', 'sub/deep.txt', 'missing.txt'):
+                history = [commit.sha for commit in walker.file_history([head], path)]
+                self.assertEqual(history, self.log('--', path))
+        finally:
+            store.close()
+
+    def test_refs(self):
+        git(self.repository_path, 'checkout', '-q', '-b', 'feature', 'HEAD~2')
+        with open(os.path.join(self.repository_path, 'note0.txt'), 'w') as f:
+            f.write('changed on feature\n')
+        git(self.repository_path, 'commit', '-q', '-am', 'Feature change')
+        git(self.repository_path, 'tag', '-a', 'v1', '-m', 'Tag')
+        git(self.repository_path, 'checkout', '-q', '-')
+
+        self.assertEqual(len(get_commits_with_file(self.repository_path, 'note0.txt')), 1)
+        commits = get_commits_with_file(self.repository_path, 'note0.txt', ['v1'])
+        self.assertEqual([commit[0] for commit in commits], self.log('v1', '--', 'note0.txt'))
+        self.assertEqual(get_commits_with_file(self.repository_path, 'note0.txt', ['nonexistent']), [])
+
+    def test_objects_inflated_once(self):
+        git(self.repository_path, 'repack', '-adfq')
+        store = ObjectStore(self.git_dir)
+        try:
+            walker = HistoryWalker(store)
+            head = read_ref(self.git_dir, 'HEAD')
+            walker.file_history([head], 'data.txt')
+            first = dict(walker.stats()['objects'])
+            walker.file_history([head], 'note1.txt')
+            stats = walker.stats()
+            # Второй обход читает те же коммиты и корневые деревья только из кэша
+            self.assertEqual(stats['objects']['misses'], first['misses'])
+            self.assertGreater(stats['objects']['hits'], first['hits'])
+            self.assertEqual(stats['commits']['parsed'], 5)
+            self.assertEqual(stats['objects']['misses'], len(store.cache.items))
+        finally:
+            store.close()
+
+    def test_cache_evicts_by_bytes(self):
+        cache = ObjectCache(max_bytes=10)
+        cache.put('a', ('blob', b'12345'))
+        cache.put('b', ('blob', b'12345'))
+        self.assertEqual(cache.get('a'), ('blob', b'12345'))
+        cache.put('c', ('blob', b'123'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.size, 10)
+        cache.put('huge', ('blob', b'x' * 11))
+        self.assertIsNone(cache.get('huge'))
+
+if __name__ == '__main__':
+    unittest.main()
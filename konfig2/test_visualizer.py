@@ -13,7 +13,10 @@ class TestVisualizer(unittest.TestCase):
         with open(os.path.join(self.test_repo_path, 'test_file.txt'), 'w') as f:
             f.write('Test content')
         subprocess.run(['git', 'add', '.'], cwd=self.test_repo_path)
-        subprocess.run(['git', 'commit', '-m', 'Initial commit'], cwd=self.test_repo_path)
+        # Автор задаётся явно: в чистом окружении глобальной настройки git может не быть
+        env = dict(os.environ, GIT_AUTHOR_NAME='Tester', GIT_AUTHOR_EMAIL='tester@example.com',
+                   GIT_COMMITTER_NAME='Tester', GIT_COMMITTER_EMAIL='tester@example.com')
+        subprocess.run(['git', 'commit', '-m', 'Initial commit'], cwd=self.test_repo_path, env=env)
 
     def tearDown(self):
         # Удаляем тестовый репозиторий после завершения тестов
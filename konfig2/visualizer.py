@@ -1,6 +1,10 @@
 import os
-import zlib
 import yaml
+from datetime import datetime, timedelta, timezone
+
+from commitgraph import graph_path, load_or_create
+from gitdb import DEFAULT_CACHE_BYTES, ObjectStore
+from history import HistoryWalker, parse_commit, read_ref
 
 def load_config(config_path):
     """Загружает конфигурацию из YAML файла."""
@@ -10,53 +14,53 @@ def load_config(config_path):
         print(config)
         return config
 
-def decompress_object(data):
-    """Разжимает объект Git."""
-    decompressed = zlib.decompress(data)
-    header, _, body = decompressed.partition(b'\x00')
-    return body.decode('utf-8', errors='ignore')
+def open_store(repository_path, cache_bytes=DEFAULT_CACHE_BYTES):
+    """Хранилище объектов репозитория: loose-объекты и pack-файлы."""
+    return ObjectStore(os.path.join(repository_path, '.git'), cache_bytes)
+
+def format_date(timestamp, tz):
+    """Дата автора в его часовом поясе, как в git log --date=iso."""
+    sign = -1 if tz.startswith('-') else 1
+    offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5]))
+    moment = datetime.fromtimestamp(timestamp, timezone(sign * offset))
+    return moment.strftime('%Y-%m-%d %H:%M:%S %z')
 
-def get_commit_info(repository_path, commit_hash):
+def get_commit_info(repository_path, commit_hash, store=None):
     """Получает информацию о коммите по его хешу."""
     print(f"Repository Path: {repository_path}")
     print(f"Commit Hash: {commit_hash}")
 
-    # Формируем путь к объекту коммита
-    object_dir = os.path.join(repository_path, '.git', 'objects', commit_hash[:2])
-    object_file = os.path.join(object_dir, commit_hash[2:])
-
-    if not os.path.exists(object_file):
-        print(f"Error: The commit object {object_file} does not exist.")
+    # Объект ищется и среди loose-объектов, и в pack-файлах
+    own_store = store is None
+    if own_store:
+        store = open_store(repository_path)
+    try:
+        _, data = store.read(commit_hash)
+    except KeyError:
+        print(f"Error: The commit object {commit_hash} does not exist.")
         return None
-
-    # Читаем и разжимаем объект коммита
-    with open(object_file, 'rb') as f:
-        data = f.read()
-        commit_content = decompress_object(data)
-
-    print(f"Commit content:\n{commit_content}")
-
-    # Извлекаем информацию о коммите
-    lines = commit_content.split('\n')
-    commit_info = {
-        'hash': commit_hash,
-        'author': '',
-        'date': '',
-        'message': ''
-    }
-
-    for line in lines:
-        if line.startswith('author'):
-            commit_info['author'] = line.split(' ', 1)[1]
-        elif line.startswith('date'):
-            commit_info['date'] = line.split(' ', 1)[1]
-        elif line.startswith('    '):
-            commit_info['message'] += line.strip() + '\n'
-
-    return (commit_info['hash'], commit_info['author'], commit_info['date'])
-
-def get_commits_with_file(repository_path, file_path):
-    """Получает коммиты, связанные с файлом, по его пути."""
+    finally:
+        if own_store:
+            store.close()
+    commit = parse_commit(commit_hash, data)
+    print(f"Commit content:\n{data.decode('utf-8', errors='ignore')}")
+
+    return (commit.sha, commit.author, format_date(commit.timestamp, commit.timezone))
+
+def report_cache_stats(stats):
+    """Печатает счётчики кэша объектов и таблицы разобранных коммитов."""
+    objects, commits = stats['objects'], stats['commits']
+    print(f"Object cache: {objects['hits']} hits, {objects['misses']} misses, "
+          f"{objects['evictions']} evictions, {objects['bytes']} bytes in {objects['objects']} objects")
+    print(f"Commit memo: {commits['hits']} hits, {commits['misses']} misses")
+
+def get_commits_with_file(repository_path, file_path, refs=None, cache_bytes=DEFAULT_CACHE_BYTES,
+                          commit_graph=None):
+    """Получает коммиты, изменявшие файл, обходом истории от refs (по умолчанию HEAD).
+
+    С commit_graph (путь к файлу индекса) история берётся из индекса графа
+    коммитов, который дополняется новыми коммитами и сохраняется.
+    """
     print(f"Repository Path: {repository_path}")
     print(f"File Path: {file_path}")
 
@@ -65,26 +69,50 @@ def get_commits_with_file(repository_path, file_path):
     if not os.path.exists(full_file_path):
         print(f"Error: The file {full_file_path} does not exist in the repository.")
         return []
+    relative_path = os.path.relpath(full_file_path, repository_path).replace(os.sep, '/')
+
+    git_dir = os.path.join(repository_path, '.git')
+    starts = []
+    for ref in refs or ['HEAD']:
+        sha = read_ref(git_dir, ref)
+        if sha is None:
+            print(f"Error: The reference {ref} does not exist.")
+            return []
+        starts.append(sha)
+
+    # Читаются только коммиты истории и деревья вдоль пути к файлу
+    store = open_store(repository_path, cache_bytes)
+    try:
+        walker = HistoryWalker(store)
+        if commit_graph:
+            commits = get_commits_from_graph(walker, commit_graph, starts, relative_path)
+        else:
+            history = walker.file_history(starts, relative_path)
+            commits = [(commit.sha, commit.author, format_date(commit.timestamp, commit.timezone))
+                       for commit in history]
+        report_cache_stats(walker.stats())
+    finally:
+        store.close()
 
-    # Ищем коммиты, связанные с файлом
-    commits = []
-    for root, dirs, files in os.walk(os.path.join(repository_path, '.git', 'objects')):
-        for file in files:
-            if file.endswith('.idx'):
-                continue
-            object_file = os.path.join(root, file)
-            with open(object_file, 'rb') as f:
-                data = f.read()
-                try:
-                    object_content = decompress_object(data)
-                    if file_path in object_content:
-                        commit_hash = os.path.basename(root) + file
-                        commit_info = get_commit_info(repository_path, commit_hash)
-                        if commit_info:
-                            commits.append(commit_info)
-                except zlib.error:
-                    continue
+    return commits
 
+def get_commits_from_graph(walker, path, starts, file_path):
+    """История файла по индексу графа коммитов; новые коммиты сначала добавляются в индекс."""
+    graph = load_or_create(path)
+    # Теги раскрываются до коммитов: индекс хранит только коммиты
+    starts = [walker.commit(sha).sha for sha in starts]
+    added = graph.update(walker, starts)
+    if added:
+        try:
+            graph.save(path)
+            print(f"Commit graph: {added} commits added, {len(graph)} total in {path}")
+        except OSError as e:
+            print(f"Error: Could not write commit graph {path}: {e}")
+
+    commits = []
+    for i in graph.file_history(walker, starts, file_path):
+        sha, author, timestamp, tz = graph.info(i)
+        commits.append((sha, author, format_date(timestamp, tz)))
     return commits
 
 def save_output(output_path, graph_code):
@@ -120,8 +148,10 @@ def main():
         print(f"Error: The repository path {repository_path} is not valid.")
         return
 
-    # Получаем коммиты для файла (по пути)
-    commits = get_commits_with_file(repository_path, file_path)
+    # Получаем коммиты для файла (по пути), обход от HEAD или от ссылок из конфигурации
+    commits = get_commits_with_file(repository_path, file_path, config.get('refs'),
+                                    config.get('object_cache_size', DEFAULT_CACHE_BYTES),
+                                    config.get('commit_graph_path', graph_path(repository_path)))
 
     if commits:
         # Строим граф зависимости для найденных коммитов